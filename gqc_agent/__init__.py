@@ -1,3 +1,7 @@
 from gqc_agent.core.orchestrator import AgentPipeline
+from gqc_agent.core._history.history_store import HistoryStore, InMemoryHistoryStore, SQLiteHistoryStore
+from gqc_agent.core._intent_classifier.local_model import LocalIntentModel
+from gqc_agent.core._intent_classifier.decision_log import IntentDecisionLog, read_decision_log
 
-__all__ = ["AgentPipeline"]
+__all__ = ["AgentPipeline", "HistoryStore", "InMemoryHistoryStore", "SQLiteHistoryStore",
+           "LocalIntentModel", "IntentDecisionLog", "read_decision_log"]
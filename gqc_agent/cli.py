@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+
+# Environment variable holding the API key of each provider
+API_KEY_ENV = {
+    "gpt": "OPENAI_API_KEY",
+    "gemini": "GEMINI_API_KEY"
+}
+
+
+def _add_pipeline_arguments(parser):
+    parser.add_argument("--provider", required=True, choices=["gpt", "gemini", "stub"],
+                        help="LLM provider. 'stub' is a local stand-in that needs no API key.")
+    parser.add_argument("--model", required=True, help="Model name, e.g. gpt-4o-mini or stub-small.")
+    parser.add_argument("--api-key", default=None,
+                        help="Provider API key. Defaults to OPENAI_API_KEY / GEMINI_API_KEY.")
+    parser.add_argument("--agent-configs", default=None,
+                        help="JSON object of per-agent overrides, e.g. "
+                             "'{\"intent_classifier\": {\"model\": \"gpt-4.1-nano\", \"max_output_tokens\": 20}}'. "
+                             "API keys of other providers default to their environment variable.")
+    parser.add_argument("--local-intent-model", default=None,
+                        help="Local intent model artifact (see `train-intent`); confident predictions skip the LLM.")
+    parser.add_argument("--local-intent-threshold", type=float, default=0.9,
+                        help="Confidence needed to serve a local intent prediction (default: 0.9).")
+    parser.add_argument("--intent-log", default=None,
+                        help="JSONL file receiving every LLM intent decision, to train the local model.")
+    parser.add_argument("--micro-batch", default=None,
+                        help="Comma-separated agents whose concurrent calls share one multi-item request "
+                             "(intent_classifier, query_rephraser).")
+    parser.add_argument("--micro-batch-size", type=int, default=8, help="Items per micro-batched request (default: 8).")
+    parser.add_argument("--micro-batch-wait-ms", type=float, default=10.0,
+                        help="Longest time a call waits for others to join its batch (default: 10).")
+
+
+def _resolve_api_key(args):
+    if args.api_key:
+        return args.api_key
+    env_name = API_KEY_ENV.get(args.provider)
+    if env_name is None:
+        return None
+    api_key = os.getenv(env_name)
+    if not api_key:
+        raise SystemExit(f"API key missing. Pass --api-key or set {env_name}.")
+    return api_key
+
+
+def _parse_json_option(value: str, option: str):
+    if value is None:
+        return None
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError as e:
+        raise SystemExit(f"{option} must be a JSON object: {e}")
+    if not isinstance(parsed, dict):
+        raise SystemExit(f"{option} must be a JSON object")
+    return parsed
+
+
+def _resolve_agent_configs(args):
+    agent_configs = _parse_json_option(args.agent_configs, "--agent-configs")
+    if not agent_configs:
+        return None
+    for config in agent_configs.values():
+        provider = config.get("provider", args.provider)
+        if provider != args.provider and "api_key" not in config and provider in API_KEY_ENV:
+            api_key = os.getenv(API_KEY_ENV[provider])
+            if not api_key:
+                raise SystemExit(f"API key missing for provider '{provider}'. Set {API_KEY_ENV[provider]}.")
+            config["api_key"] = api_key
+    return agent_configs
+
+
+def _run_serve(args):
+    from gqc_agent.core._server.http_server import run_server
+
+    run_server(
+        api_key=_resolve_api_key(args),
+        model=args.model,
+        provider=args.provider,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        drain_timeout=args.drain_timeout,
+        batch_concurrency=args.batch_concurrency,
+        max_threads=args.max_threads,
+        stub_latency=args.stub_latency,
+        agent_configs=_resolve_agent_configs(args),
+        local_intent_model=args.local_intent_model,
+        local_intent_threshold=args.local_intent_threshold,
+        intent_log=args.intent_log,
+        micro_batch_agents=args.micro_batch.split(",") if args.micro_batch else None,
+        micro_batch_size=args.micro_batch_size,
+        micro_batch_wait_ms=args.micro_batch_wait_ms,
+        max_in_flight=args.max_in_flight,
+        max_queue=args.max_queue,
+        max_queue_wait_ms=args.max_queue_wait_ms,
+        circuit_breaker=_parse_json_option(args.circuit_breaker, "--circuit-breaker"),
+        degraded_response=_parse_json_option(args.degraded_response, "--degraded-response")
+    )
+
+
+def _run_batch(args):
+    from gqc_agent.core._batch.batch_runner import run_batch
+
+    try:
+        total = run_batch(
+            input_path=args.input,
+            output_path=args.output,
+            api_key=_resolve_api_key(args),
+            model=args.model,
+            provider=args.provider,
+            workers=args.workers,
+            concurrency=args.concurrency,
+            checkpoint_every=args.checkpoint_every,
+            batch_api=args.batch_api,
+            batch_size=args.batch_size,
+            poll_interval=args.poll_interval,
+            max_pending_chunks=args.max_pending_chunks,
+            stub_latency=args.stub_latency,
+            agent_configs=_resolve_agent_configs(args),
+            local_intent_model=args.local_intent_model,
+            local_intent_threshold=args.local_intent_threshold,
+            intent_log=args.intent_log,
+            micro_batch_agents=args.micro_batch.split(",") if args.micro_batch else None,
+            micro_batch_size=args.micro_batch_size,
+            micro_batch_wait_ms=args.micro_batch_wait_ms
+        )
+    except KeyboardInterrupt:
+        raise SystemExit("Interrupted. Progress is checkpointed; re-run the same command to resume.")
+    print(f"Wrote {total} records to {args.output}")
+
+
+def _run_train_intent(args):
+    from gqc_agent.core._intent_classifier.decision_log import read_decision_log
+    from gqc_agent.core._intent_classifier.local_model import train_local_intent_model
+
+    records = read_decision_log(args.log)
+    if not records:
+        raise SystemExit(f"No intent decisions found in {args.log}")
+    model, report = train_local_intent_model(records, holdout=args.holdout, threshold=args.threshold, epochs=args.epochs)
+    model.save(args.output)
+    print(f"Trained on {len(records)} decisions, saved to {args.output}")
+    if report["examples"]:
+        print(f"Held-out decisions:        {report['examples']}")
+        print(f"Agreement with the LLM:    {report['agreement']:.1%}")
+        print(f"Served locally at {args.threshold:g}:   {report['coverage']:.1%} (agreement {report['served_agreement']:.1%})")
+        print(f"Latency saved per request: {report['latency_saved_per_request'] * 1000:.0f} ms")
+
+
+def build_parser():
+    """
+    Build the `gqc_agent` command line parser.
+
+    Returns:
+        argparse.ArgumentParser: Parser with one sub-command per entry point.
+    """
+    parser = argparse.ArgumentParser(prog="gqc_agent", description="GQC Agent command line tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Serve the GQC pipeline over HTTP.")
+    _add_pipeline_arguments(serve)
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1).")
+    serve.add_argument("--port", type=int, default=8000, help="Port to bind (default: 8000).")
+    serve.add_argument("--workers", type=int, default=1, help="Number of worker processes (default: 1).")
+    serve.add_argument("--drain-timeout", type=float, default=30.0,
+                       help="Seconds to wait for in-flight requests on shutdown (default: 30).")
+    serve.add_argument("--batch-concurrency", type=int, default=16,
+                       help="Conversations processed at once per /gqc/batch request (default: 16).")
+    serve.add_argument("--max-threads", type=int, default=64,
+                       help="Per-worker threads for blocking provider calls (default: 64).")
+    serve.add_argument("--stub-latency", type=float, default=0.0,
+                       help="Simulated latency in seconds for the stub provider (default: 0).")
+    serve.add_argument("--max-in-flight", type=int, default=None,
+                       help="Pipeline runs executing at once per worker; excess runs queue, then get 503 (default: unbounded).")
+    serve.add_argument("--max-queue", type=int, default=100, help="Runs allowed to wait for a slot per worker (default: 100).")
+    serve.add_argument("--max-queue-wait-ms", type=float, default=1000.0,
+                       help="Longest time a run waits for a slot (default: 1000).")
+    serve.add_argument("--circuit-breaker", default=None,
+                       help="Enable per provider/model circuit breakers with JSON settings, e.g. "
+                            "'{\"failure_rate\": 0.5, \"slow_call_ms\": 8000, \"open_seconds\": 30}' ('{}' for defaults).")
+    serve.add_argument("--degraded-response", default=None,
+                       help="JSON agent outputs returned while a breaker is open, e.g. '{\"intent\": \"ambiguous\"}'.")
+    serve.set_defaults(handler=_run_serve)
+
+    batch = subparsers.add_parser("batch", help="Process a JSONL file of conversations offline.")
+    _add_pipeline_arguments(batch)
+    batch.add_argument("--input", required=True, help="JSONL input, one user input (or {\"id\", \"user_input\"}) per line.")
+    batch.add_argument("--output", required=True, help="JSONL output file.")
+    batch.add_argument("--workers", type=int, default=1, help="Number of worker processes (default: 1).")
+    batch.add_argument("--concurrency", type=int, default=8, help="Records processed at once per worker (default: 8).")
+    batch.add_argument("--checkpoint-every", type=int, default=100,
+                       help="Records written between checkpoints (default: 100).")
+    batch.add_argument("--batch-api", action="store_true",
+                       help="Submit through the provider's Batch API (gpt and stub only).")
+    batch.add_argument("--batch-size", type=int, default=1000, help="Records per Batch API job (default: 1000).")
+    batch.add_argument("--poll-interval", type=float, default=30.0,
+                       help="Seconds between Batch API status checks (default: 30).")
+    batch.add_argument("--max-pending-chunks", type=int, default=4,
+                       help="Batch API chunks submitted before waiting for the oldest one (default: 4).")
+    batch.add_argument("--stub-latency", type=float, default=0.0,
+                       help="Simulated latency in seconds for the stub provider (default: 0).")
+    batch.set_defaults(handler=_run_batch)
+
+    train = subparsers.add_parser("train-intent", help="Train the local intent model from logged LLM decisions.")
+    train.add_argument("--log", required=True, help="Intent decision log written with --intent-log.")
+    train.add_argument("--output", required=True, help="Model artifact to write, e.g. intent_model.npz.")
+    train.add_argument("--holdout", type=float, default=0.2,
+                       help="Share of decisions held out to measure agreement (default: 0.2).")
+    train.add_argument("--threshold", type=float, default=0.9,
+                       help="Confidence threshold used in the report (default: 0.9).")
+    train.add_argument("--epochs", type=int, default=300, help="Training epochs (default: 300).")
+    train.set_defaults(handler=_run_train_intent)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of `gqc_agent` / `python -m gqc_agent`.
+
+    Args:
+        argv (list, optional): Command line arguments. Defaults to sys.argv[1:].
+    """
+    args = build_parser().parse_args(argv)
+    args.handler(args)
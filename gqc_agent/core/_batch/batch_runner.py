@@ -0,0 +1,412 @@
+import asyncio
+import collections
+import json
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from gqc_agent.core.orchestrator import AgentPipeline, AGENT_OUTPUT_KEYS, build_pipeline
+from gqc_agent.core._intent_classifier.classifier import build_intent_prompt
+from gqc_agent.core._query_rephraser.rephraser import build_rephrase_prompt
+from gqc_agent.core._note_creator.note_creator import build_note_prompt
+from gqc_agent.core._llm_models.llm_router import submit_llm_batch, wait_llm_batch
+from gqc_agent.core._system_prompts.loader import load_system_prompt
+from gqc_agent.core._constants.constants import CLASSIFIER_PROMPT, QUERY_REPHRASOR_PROMPT, NOTES_CREATOR_PROMPT
+from gqc_agent.core._metrics.metrics import metrics
+
+# Record key holding the conversation when the input line is wrapped as {"id": ..., "user_input": {...}}
+USER_INPUT_KEY = "user_input"
+RECORD_ID_KEY = "id"
+
+
+def _part_path(output_path: str, shard: int) -> str:
+    return f"{output_path}.part-{shard}"
+
+
+def _checkpoint_path(output_path: str, shard: int) -> str:
+    return f"{output_path}.part-{shard}.ckpt"
+
+
+def _load_checkpoint(path: str, shards: int) -> dict:
+    """
+    Read a shard checkpoint.
+
+    Returns:
+        dict: {"next_line": int, "output_offset": int, "done": bool, "batch_jobs": list}; zeros for a fresh shard.
+              `batch_jobs` lists the Batch API jobs submitted but not yet written, oldest first.
+
+    Raises:
+        ValueError: If the checkpoint was written with a different number of workers.
+    """
+    if not os.path.exists(path):
+        return {"next_line": 0, "output_offset": 0, "done": False, "batch_jobs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("shards") != shards:
+        raise ValueError(
+            f"Checkpoint '{path}' was written with {state.get('shards')} workers; resume with the same --workers"
+        )
+    return state
+
+
+def _save_checkpoint(path: str, state: dict):
+    # Write-then-rename so an interrupted write never leaves a corrupt checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _iter_shard(input_path: str, shard: int, shards: int, start_line: int):
+    """
+    Stream the input lines that belong to `shard`, starting at `start_line`.
+
+    Yields:
+        tuple: (line_no, raw_line). Line numbers are 0-based over the whole file.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, raw_line in enumerate(f):
+            if line_no < start_line or line_no % shards != shard or not raw_line.strip():
+                continue
+            yield line_no, raw_line
+
+
+def _parse_record(raw_line: str):
+    """
+    Parse one input line.
+
+    Returns:
+        tuple: (record_id, user_input, error). `user_input` is None when `error` is set.
+    """
+    try:
+        record = json.loads(raw_line)
+    except json.JSONDecodeError:
+        return None, None, "Invalid JSON"
+    if not isinstance(record, dict):
+        return None, None, "Invalid input format"
+    if USER_INPUT_KEY in record:
+        return record.get(RECORD_ID_KEY), record[USER_INPUT_KEY], None
+    return record.get(RECORD_ID_KEY), record, None
+
+
+class _ShardWriter:
+    """
+    Ordered JSONL writer for one shard, with periodic checkpoints.
+
+    Results are written in input order, so the checkpoint is a single
+    (next_line, output_offset) watermark and memory stays bounded by the
+    number of in-flight records.
+    """
+    def __init__(self, output_path: str, shard: int, shards: int, checkpoint_every: int):
+        self.part_path = _part_path(output_path, shard)
+        self.checkpoint_path = _checkpoint_path(output_path, shard)
+        self.shards = shards
+        self.checkpoint_every = checkpoint_every
+        self.state = _load_checkpoint(self.checkpoint_path, shards)
+        self.written = 0
+
+        # Drop anything written after the last checkpoint; those lines are reprocessed
+        self._file = open(self.part_path, "a+b")
+        self._file.truncate(self.state["output_offset"])
+        self._file.seek(self.state["output_offset"])
+
+    def write(self, line_no: int, record_id, result: dict):
+        row = {"line": line_no, "id": record_id, "result": result}
+        self._file.write((json.dumps(row) + "\n").encode("utf-8"))
+        self.state["next_line"] = line_no + 1
+        self.written += 1
+        metrics.inc("gqc_batch_records_total")
+        if self.written % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def checkpoint(self, done: bool = False):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.state.update({"output_offset": self._file.tell(), "shards": self.shards, "done": done})
+        _save_checkpoint(self.checkpoint_path, self.state)
+
+    def close(self, done: bool):
+        self.checkpoint(done=done)
+        self._file.close()
+
+
+async def _process_shard_direct(pipeline: AgentPipeline, writer: _ShardWriter, input_path: str,
+                                shard: int, shards: int, concurrency: int):
+    """Run every record of the shard through `arun_gqc`, at most `concurrency` at a time."""
+    # Every record needs one thread per agent plus one for validation
+    threads = concurrency * (len(AGENT_OUTPUT_KEYS) + 1)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads, thread_name_prefix="gqc-batch"))
+    pending = collections.deque()
+
+    async def run_record(raw_line):
+        record_id, user_input, error = _parse_record(raw_line)
+        if error:
+            return record_id, {"error": error}
+        return record_id, await pipeline.arun_gqc(user_input)
+
+    async def write_oldest():
+        line_no, task = pending.popleft()
+        record_id, result = await task
+        writer.write(line_no, record_id, result)
+
+    for line_no, raw_line in _iter_shard(input_path, shard, shards, writer.state["next_line"]):
+        pending.append((line_no, asyncio.ensure_future(run_record(raw_line))))
+        if len(pending) >= concurrency:
+            await write_oldest()
+    while pending:
+        await write_oldest()
+
+
+def _process_shard_batch_api(pipeline: AgentPipeline, writer: _ShardWriter, input_path: str, shard: int, shards: int,
+                             batch_size: int, poll_interval: float, max_pending_chunks: int):
+    """
+    Submit the shard through the provider's Batch API, `batch_size` records per chunk.
+
+    Every chunk gets one job per agent, since each agent may use its own provider and
+    model. Up to `max_pending_chunks` chunks are submitted before the oldest one is
+    waited for, so the provider works on them concurrently. Job ids are checkpointed
+    as soon as they are submitted: a resumed run waits for the same jobs again
+    instead of paying for the same records twice.
+    """
+    system_prompts = {
+        "intent_classifier": load_system_prompt(CLASSIFIER_PROMPT),
+        "query_rephraser": load_system_prompt(QUERY_REPHRASOR_PROMPT),
+        "note_creator": load_system_prompt(NOTES_CREATOR_PROMPT)
+    }
+    saved = collections.deque(writer.state.get("batch_jobs", []))  # jobs of an interrupted run, oldest first
+    pending = collections.deque()  # [chunk, {agent name: batch id}, resumed], oldest first
+
+    def prepare(line_no, raw_line):
+        record_id, user_input, error = _parse_record(raw_line)
+        agent_input = note_creator_input = None
+        if not error:
+            # Same validation as run_gqc, done up front so invalid records are not submitted
+            agent_input, note_creator_input, validation_error = pipeline._prepare_agent_inputs(user_input)
+            if validation_error:
+                error = validation_error["error"]
+        return line_no, record_id, agent_input, note_creator_input, error
+
+    def iter_chunks():
+        """Yield (chunk, saved job entry or None); chunks of an interrupted run keep their boundaries."""
+        chunk, resumed = [], None
+        for line_no, raw_line in _iter_shard(input_path, shard, shards, writer.state["next_line"]):
+            while saved and saved[0]["last_line"] < line_no:
+                saved.popleft()  # already written
+            if resumed is None and saved and saved[0]["first_line"] <= line_no:
+                if chunk:
+                    yield chunk, None
+                chunk, resumed = [], saved.popleft()
+            chunk.append(prepare(line_no, raw_line))
+            if (line_no >= resumed["last_line"]) if resumed else (len(chunk) >= batch_size):
+                yield chunk, resumed
+                chunk, resumed = [], None
+        if chunk:
+            yield chunk, resumed
+
+    def submit(chunk):
+        items = {name: [] for name in AGENT_OUTPUT_KEYS}
+        for line_no, _, agent_input, note_creator_input, error in chunk:
+            if error:
+                continue
+            items["intent_classifier"].append((f"{line_no}:intent_classifier", system_prompts["intent_classifier"], build_intent_prompt(agent_input)))
+            items["query_rephraser"].append((f"{line_no}:query_rephraser", system_prompts["query_rephraser"], build_rephrase_prompt(agent_input)))
+            items["note_creator"].append((f"{line_no}:note_creator", system_prompts["note_creator"], build_note_prompt(note_creator_input)))
+        jobs = {}
+        for name, agent_items in items.items():
+            if agent_items:
+                config = pipeline.agent_configs[name]
+                jobs[name] = submit_llm_batch(config["client"], config["model"], config["provider"], agent_items,
+                                              config["generation_config"])
+                metrics.inc("gqc_batch_jobs_submitted_total", agent=name)
+        return jobs
+
+    def save_jobs():
+        writer.state["batch_jobs"] = [{"first_line": chunk[0][0], "last_line": chunk[-1][0], "jobs": jobs}
+                                      for chunk, jobs, _ in pending]
+        writer.checkpoint()
+
+    def wait(jobs):
+        responses = {}
+        for name, batch_id in jobs.items():
+            config = pipeline.agent_configs[name]
+            responses.update(wait_llm_batch(config["client"], config["provider"], batch_id, poll_interval))
+        return responses
+
+    def write_oldest():
+        chunk, jobs, resumed = pending[0]
+        try:
+            responses = wait(jobs)
+        except RuntimeError as e:
+            if not resumed:
+                # Forget the failed jobs, so the next run submits the chunk again
+                pending.popleft()
+                save_jobs()
+                raise
+            # A job of an interrupted run can no longer be picked up (e.g. it expired): submit again
+            print(f"Batch worker {shard} could not resume jobs {list(jobs.values())} ({e}); resubmitting.")
+            pending[0] = [chunk, submit(chunk), False]
+            save_jobs()
+            return write_oldest()
+
+        for line_no, record_id, _, _, error in chunk:
+            if error:
+                writer.write(line_no, record_id, {"error": error})
+                continue
+            results = {}
+            for name in AGENT_OUTPUT_KEYS:
+                raw = responses.get(f"{line_no}:{name}")
+                try:
+                    results[name] = json.loads(raw) if raw else None
+                except json.JSONDecodeError:
+                    results[name] = None
+            writer.write(line_no, record_id, pipeline._merge_results(results))
+        pending.popleft()
+        save_jobs()
+
+    for chunk, resumed in iter_chunks():
+        pending.append([chunk, resumed["jobs"] if resumed else submit(chunk), resumed is not None])
+        save_jobs()
+        if len(pending) >= max_pending_chunks:
+            write_oldest()
+    while pending:
+        write_oldest()
+
+
+def _shard_main(pipeline_config: dict, input_path: str, output_path: str, shard: int, shards: int, options: dict):
+    if _load_checkpoint(_checkpoint_path(output_path, shard), shards).get("done"):
+        return
+    writer = _ShardWriter(output_path, shard, shards, options["checkpoint_every"])
+    pipeline = build_pipeline(pipeline_config)
+    done = False
+    try:
+        if options["batch_api"]:
+            _process_shard_batch_api(pipeline, writer, input_path, shard, shards, options["batch_size"],
+                                     options["poll_interval"], options["max_pending_chunks"])
+        else:
+            asyncio.run(_process_shard_direct(pipeline, writer, input_path, shard, shards, options["concurrency"]))
+        done = True
+    except KeyboardInterrupt:
+        # Checkpoint (in `finally`) and propagate, so the caller does not merge a partial output
+        print(f"Batch worker {shard} interrupted before line {writer.state['next_line']}; re-run to resume.")
+        raise
+    finally:
+        writer.close(done)
+
+
+def run_batch(input_path: str, output_path: str, api_key: str, model: str, provider: str,
+              workers: int = 1, concurrency: int = 8, checkpoint_every: int = 100,
+              batch_api: bool = False, batch_size: int = 1000, poll_interval: float = 30.0, max_pending_chunks: int = 4,
+              stub_latency: float = 0.0, agent_configs: dict = None,
+              local_intent_model: str = None, local_intent_threshold: float = 0.9, intent_log: str = None,
+              micro_batch_agents: list = None, micro_batch_size: int = 8, micro_batch_wait_ms: float = 10.0):
+    """
+    Process a JSONL file of conversations through the GQC pipeline.
+
+    Each input line is either a `run_gqc` user input or {"id": ..., "user_input": {...}}.
+    Each output line is {"line": int, "id": ..., "result": {...}}; lines are grouped
+    by worker, so use "line" to restore input order if needed.
+
+    The input is streamed and split round-robin across `workers` processes. Every
+    worker writes its own part file next to `output_path` and checkpoints its
+    progress; running the same command again after an interruption resumes
+    from the checkpoints. Part files are merged into `output_path` once all
+    workers finish.
+
+    Args:
+        input_path (str): JSONL input file.
+        output_path (str): JSONL output file.
+        api_key (str): OpenAI or Gemini API key (unused for the "stub" provider).
+        model (str): Model name.
+        provider (str): "gpt", "gemini" or "stub".
+        workers (int): Number of worker processes.
+        concurrency (int): Records processed at once per worker (direct mode).
+        checkpoint_every (int): Records written between checkpoints.
+        batch_api (bool): Submit through the provider's Batch API instead of direct calls
+                          ("gpt" and "stub" only).
+        batch_size (int): Records per Batch API job.
+        poll_interval (float): Seconds between Batch API status checks.
+        max_pending_chunks (int): Chunks (one job per agent each) submitted to the Batch API
+                                  before waiting for the oldest one.
+        stub_latency (float): Simulated provider latency in seconds for the "stub" provider.
+        agent_configs (dict, optional): Per-agent provider/model/generation overrides
+                                        (see `AgentPipeline`).
+        local_intent_model (str, optional): Path of a saved `LocalIntentModel` artifact. Not used in Batch API mode.
+        local_intent_threshold (float): Confidence needed to serve a local intent prediction.
+        intent_log (str, optional): JSONL file receiving every LLM intent decision. Not used in Batch API mode.
+        micro_batch_agents (list, optional): Agents whose concurrent calls are merged into
+                                             multi-item provider requests (see `AgentPipeline`).
+        micro_batch_size (int): Items per micro-batched request.
+        micro_batch_wait_ms (float): Longest time a call waits for others to join its batch.
+
+    Returns:
+        int: Number of records written to `output_path`.
+
+    Raises:
+        ValueError: If an argument is invalid or checkpoints do not match `workers`.
+    """
+    if workers < 1 or concurrency < 1 or checkpoint_every < 1 or batch_size < 1 or max_pending_chunks < 1:
+        raise ValueError("`workers`, `concurrency`, `checkpoint_every`, `batch_size` and `max_pending_chunks` must be at least 1")
+    agent_providers = [config.get("provider", provider) for config in (agent_configs or {}).values()]
+    if batch_api and any(p not in ("gpt", "stub") for p in [provider] + agent_providers):
+        raise ValueError("Batch API mode is only supported for the 'gpt' and 'stub' providers")
+    if not os.path.exists(input_path):
+        raise ValueError(f"Input file '{input_path}' not found")
+
+    pipeline_config = {"api_key": api_key, "model": model, "provider": provider, "stub_latency": stub_latency,
+                       "agent_configs": agent_configs, "local_intent_model": local_intent_model,
+                       "local_intent_threshold": local_intent_threshold, "intent_log": intent_log,
+                       "micro_batch_agents": micro_batch_agents, "micro_batch_size": micro_batch_size,
+                       "micro_batch_wait_ms": micro_batch_wait_ms}
+    options = {
+        "concurrency": concurrency,
+        "checkpoint_every": checkpoint_every,
+        "batch_api": batch_api,
+        "batch_size": batch_size,
+        "poll_interval": poll_interval,
+        "max_pending_chunks": max_pending_chunks
+    }
+
+    if workers == 1:
+        _shard_main(pipeline_config, input_path, output_path, 0, 1, options)
+    else:
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=_shard_main, args=(pipeline_config, input_path, output_path, shard, workers, options),
+                            name=f"gqc-batch-{shard}")
+            for shard in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # Workers received the same SIGINT and checkpoint on their own
+            for process in processes:
+                process.join()
+            raise
+        failed = [p.name for p in processes if p.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Batch worker(s) failed: {failed}. Re-run the same command to resume.")
+
+    # Merge only once every shard has finished; anything else is resumed by the next run
+    unfinished = [shard for shard in range(workers)
+                  if not _load_checkpoint(_checkpoint_path(output_path, shard), workers).get("done")]
+    if unfinished:
+        raise RuntimeError(f"Batch shard(s) {unfinished} did not finish. Re-run the same command to resume.")
+
+    # -----------------------------
+    # Merge part files into the final output
+    # -----------------------------
+    total = 0
+    with open(output_path, "wb") as out:
+        for shard in range(workers):
+            with open(_part_path(output_path, shard), "rb") as part:
+                for line in part:
+                    out.write(line)
+                    total += 1
+    for shard in range(workers):
+        os.remove(_part_path(output_path, shard))
+        os.remove(_checkpoint_path(output_path, shard))
+    return total
@@ -0,0 +1,142 @@
+import abc
+import collections
+import json
+import sqlite3
+import threading
+
+# Default number of history messages kept per conversation: the last three user
+# queries and their responses, matching the input format documented for run_gqc.
+DEFAULT_MAX_MESSAGES = 6
+
+
+class HistoryStore(abc.ABC):
+    """
+    Interface of a server-side conversation history store.
+
+    Implementations keep at most `max_messages` messages per conversation; older
+    messages are dropped as new ones are appended.
+    """
+    max_messages = DEFAULT_MAX_MESSAGES
+
+    @abc.abstractmethod
+    def append(self, conversation_id: str, message: dict):
+        """Append one validated history message to a conversation."""
+
+    @abc.abstractmethod
+    def get(self, conversation_id: str) -> list:
+        """Return the retained messages of a conversation, oldest first."""
+
+    @abc.abstractmethod
+    def clear(self, conversation_id: str):
+        """Delete a conversation's history."""
+
+
+class InMemoryHistoryStore(HistoryStore):
+    """
+    Process-local history store.
+
+    Each conversation is a ring buffer of `max_messages` messages. When more than
+    `max_sessions` conversations are held, the least recently used one is evicted.
+
+    Attributes:
+        max_messages (int): Messages kept per conversation.
+        max_sessions (int): Conversations kept before LRU eviction.
+        evictions (int): Number of conversations evicted so far.
+    """
+    def __init__(self, max_messages: int = DEFAULT_MAX_MESSAGES, max_sessions: int = 10000):
+        if max_messages < 1 or max_sessions < 1:
+            raise ValueError("`max_messages` and `max_sessions` must be at least 1")
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._sessions = collections.OrderedDict()
+
+    def append(self, conversation_id: str, message: dict):
+        with self._lock:
+            buffer = self._sessions.get(conversation_id)
+            if buffer is None:
+                buffer = collections.deque(maxlen=self.max_messages)
+                self._sessions[conversation_id] = buffer
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._sessions.move_to_end(conversation_id)
+            buffer.append(message)
+
+    def get(self, conversation_id: str) -> list:
+        with self._lock:
+            buffer = self._sessions.get(conversation_id)
+            if buffer is None:
+                return []
+            self._sessions.move_to_end(conversation_id)
+            return list(buffer)
+
+    def clear(self, conversation_id: str):
+        with self._lock:
+            self._sessions.pop(conversation_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    History store persisted in a SQLite database, shared by every process that opens the same file.
+
+    Attributes:
+        path (str): Database file (":memory:" for a private in-memory database).
+        max_messages (int): Messages kept per conversation.
+    """
+    def __init__(self, path: str, max_messages: int = DEFAULT_MAX_MESSAGES):
+        if max_messages < 1:
+            raise ValueError("`max_messages` must be at least 1")
+        self.path = path
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS gqc_history ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "conversation_id TEXT NOT NULL, "
+            "message TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS gqc_history_conversation ON gqc_history (conversation_id, seq)")
+
+    def append(self, conversation_id: str, message: dict):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO gqc_history (conversation_id, message) VALUES (?, ?)",
+                    (conversation_id, json.dumps(message))
+                )
+                # Trim to the ring buffer size
+                self._conn.execute(
+                    "DELETE FROM gqc_history WHERE conversation_id = ? AND seq NOT IN "
+                    "(SELECT seq FROM gqc_history WHERE conversation_id = ? ORDER BY seq DESC LIMIT ?)",
+                    (conversation_id, conversation_id, self.max_messages)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, conversation_id: str) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message FROM gqc_history WHERE conversation_id = ? ORDER BY seq DESC LIMIT ?",
+                (conversation_id, self.max_messages)
+            ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def clear(self, conversation_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM gqc_history WHERE conversation_id = ?", (conversation_id,))
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime
+from gqc_agent.core._validations.input_validator import validate_current, validate_history_item
+from gqc_agent.core._constants.constants import INPUT, CURRENT, HISTORY, ROLE, QUERY, RESPONSE, TIMESTAMP, USER, ASSISTANT
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _now() -> str:
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+class Session:
+    """
+    One conversation whose history is kept server-side in the pipeline's history store.
+
+    Clients send only the new turn. Each turn is validated once when it arrives,
+    so the per-turn cost does not grow with the conversation.
+
+    Attributes:
+        pipeline (AgentPipeline): Pipeline running the agents.
+        conversation_id (str): Key of the conversation in the history store.
+    """
+    def __init__(self, pipeline, conversation_id: str):
+        self.pipeline = pipeline
+        self.conversation_id = conversation_id
+
+    @property
+    def store(self):
+        return self.pipeline.history_store
+
+    def _build_user_input(self, current):
+        """
+        Validate the new turn and combine it with the stored history.
+
+        Args:
+            current (dict | str): {"role": "user", "query": str, "timestamp": str} or just the query text.
+
+        Returns:
+            tuple: (user_input, error). `error` is an error response dict when the turn is invalid.
+        """
+        if isinstance(current, str):
+            current = {ROLE: USER, QUERY: current, TIMESTAMP: _now()}
+        try:
+            validate_current(current)
+            if not current[QUERY].strip():
+                raise ValueError("`query` cannot be empty")
+        except ValueError as ve:
+            print(f"Input validation failed: {ve}")
+            return None, {"error": "Invalid input format"}
+
+        user_input = {
+            INPUT: current[QUERY],
+            CURRENT: current,
+            HISTORY: self.store.get(self.conversation_id)
+        }
+        return user_input, None
+
+    def _start_turn(self, current):
+        """
+        Build and validate the agent inputs of a new turn and claim its speculation, if any.
+
+        Blocking: reads the history store and may fetch the model catalog.
+
+        Returns:
+            tuple: (user_input, agent_input, note_creator_input, speculation, error). Only
+                   `error` is set when the turn is invalid.
+        """
+        user_input, error = self._build_user_input(current)
+        if error:
+            return None, None, None, None, error
+        agent_input, note_creator_input, error = self.pipeline._prepare_agent_inputs(user_input, validate_input_format=False)
+        if error:
+            return None, None, None, None, error
+        speculation = self.pipeline.prefetcher.take(self.conversation_id, user_input[CURRENT][QUERY])
+        return user_input, agent_input, note_creator_input, speculation, None
+
+    def run(self, current):
+        """
+        Run all agents on the new user turn, using the stored history as context.
+
+        If `pipeline.prefetch` already processed matching text for this conversation, its
+        intent and rephrased queries are reused. The turn is appended to the history afterwards,
+        unless the run returned an error (e.g. it was rejected by admission control).
+
+        Args:
+            current (dict | str): {"role": "user", "query": str, "timestamp": str} or just the query text.
+
+        Returns:
+            dict: Same combined output as `AgentPipeline.run_gqc`.
+        """
+        user_input, agent_input, note_creator_input, speculation, error = self._start_turn(current)
+        if error:
+            return error
+        result = self.pipeline._run_agents(agent_input, note_creator_input, speculation and speculation.future)
+        if "error" not in result:
+            # A rejected or failed run leaves the history unchanged
+            self.store.append(self.conversation_id, user_input[CURRENT])
+        return result
+
+    async def arun(self, current):
+        """
+        Async variant of `run`. Validation and history store access run in worker threads.
+
+        Args:
+            current (dict | str): {"role": "user", "query": str, "timestamp": str} or just the query text.
+
+        Returns:
+            dict: Same combined output as `AgentPipeline.run_gqc`.
+        """
+        user_input, agent_input, note_creator_input, speculation, error = await asyncio.to_thread(self._start_turn, current)
+        if error:
+            return error
+        result = await self.pipeline._collect(self.pipeline._astream_agents(agent_input, note_creator_input, speculation and speculation.future))
+        if "error" not in result:
+            # A rejected or failed run leaves the history unchanged
+            await asyncio.to_thread(self.store.append, self.conversation_id, user_input[CURRENT])
+        return result
+
+    def add_response(self, response: str, timestamp: str = None):
+        """
+        Append the assistant's answer to the conversation history.
+
+        Args:
+            response (str): Assistant response text.
+            timestamp (str, optional): Defaults to now ("YYYY-MM-DD HH:MM:SS").
+
+        Raises:
+            ValueError: If the message is incorrectly formatted.
+        """
+        message = {ROLE: ASSISTANT, RESPONSE: response, TIMESTAMP: timestamp or _now()}
+        if not isinstance(response, str):
+            raise ValueError("`response` must be a string")
+        validate_history_item(message)
+        self.store.append(self.conversation_id, message)
+
+    def history(self) -> list:
+        """
+        Return the retained history of the conversation, oldest first.
+
+        Returns:
+            list: History messages in the `run_gqc` input format.
+        """
+        return self.store.get(self.conversation_id)
+
+    def clear(self):
+        """Delete the conversation's history."""
+        self.store.clear(self.conversation_id)
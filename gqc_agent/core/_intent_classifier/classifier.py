@@ -1,20 +1,45 @@
 from gqc_agent.core._system_prompts.loader import load_system_prompt
-from gqc_agent.core._llm_models.gpt_client import call_gpt
-from gqc_agent.core._llm_models.gemini_client import call_gemini
+from gqc_agent.core._llm_models.llm_router import call_llm
 import json
 from gqc_agent.core._constants.constants import CURRENT, HISTORY, QUERY, ROLE, USER, CLASSIFIER_PROMPT
 
 
-def classify_intent(user_input: dict, model: str, provider: str, client, system_prompt_file=CLASSIFIER_PROMPT):
+def build_intent_prompt(user_input: dict) -> str:
+    """
+    Build the user prompt sent to the intent classifier.
+
+    Args:
+        user_input (dict): Structured input with 'current' and 'history' queries.
+
+    Returns:
+        str: User prompt with the history user queries and the current query.
+    """
+    current_query = user_input[CURRENT][QUERY]
+    history_queries = "\n".join([h[QUERY] for h in user_input.get(HISTORY, []) if h.get(ROLE) == USER])
+
+    return f"""
+    History User Queries:
+    {history_queries}
+
+    Current User Query:
+    {current_query}
+    """
+
+
+def classify_intent(user_input: dict, model: str, provider: str, client, system_prompt_file=CLASSIFIER_PROMPT, single_flight=None, generation_config=None, micro_batcher=None):
     """
     Classify user intent using GPT or Gemini.
 
     Args:
         user_input (dict): Structured input with 'current' and 'history' queries.
         model (str): Model name supported (GPT or Gemini).
-        provider (str): LLM provider, either "gpt" or "gemini".
+        provider (str): LLM provider, one of "gpt", "gemini" or "stub".
         client: Initialized LLM client (OpenAI or Gemini client object).
         system_prompt_file (str): Filename of the system prompt.
+        single_flight (SingleFlight, optional): Coalesces identical concurrent provider calls.
+        generation_config (dict, optional): {"temperature": float, "max_output_tokens": int}.
+        micro_batcher (MicroBatcher, optional): Sends the call together with other concurrent
+                                                calls in one multi-item provider request.
 
     Returns:
         dict: JSON with {"intent": "..."}.
@@ -28,30 +53,12 @@ def classify_intent(user_input: dict, model: str, provider: str, client, system_
         print(f"Error loading system prompt '{system_prompt_file}': {e}")
         return {"intent": None}
 
-    current_query = user_input[CURRENT][QUERY]
-    history_queries = "\n".join([h[QUERY] for h in user_input.get(HISTORY, []) if h.get(ROLE) == USER])
-
-    user_prompt = f"""
-    History User Queries:
-    {history_queries}
-
-    Current User Query:
-    {current_query}
-    """
+    user_prompt = build_intent_prompt(user_input)
     
-    # -----------------------------
-    # Auto route based on API key
-    # -----------------------------
-    if provider.lower() == "gpt":
-
-        response = call_gpt(client, model, system_prompt, user_prompt)
-
-    elif provider.lower() == "gemini":
-
-        response = call_gemini(client, model, system_prompt, user_prompt)
-
+    if micro_batcher is not None:
+        response = micro_batcher.submit(system_prompt, user_prompt)
     else:
-        raise ValueError("No valid API key provided or unknown model provider")
+        response = call_llm(client, model, provider, system_prompt, user_prompt, single_flight, generation_config)
 
 
     return json.loads(response)
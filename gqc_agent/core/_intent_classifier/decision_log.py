@@ -0,0 +1,63 @@
+import json
+import threading
+from gqc_agent.core._constants.constants import CURRENT, HISTORY, QUERY, ROLE, USER
+
+
+class IntentDecisionLog:
+    """
+    Append-only JSONL log of the LLM's intent decisions, used to train `LocalIntentModel`.
+
+    Each line is {"history": [str, ...], "current": str, "intent": str, "latency": float},
+    where history holds the previous user queries. Every record is written with a single
+    append, so several worker processes can share one file.
+
+    Attributes:
+        path (str): Log file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, agent_input: dict, intent: str, latency: float = None):
+        """
+        Append one decision.
+
+        Args:
+            agent_input (dict): Intent classifier input ({"current", "history"}).
+            intent (str): Intent returned by the LLM.
+            latency (float, optional): Seconds the LLM call took.
+        """
+        line = json.dumps({
+            "history": [h[QUERY] for h in agent_input.get(HISTORY, []) if h.get(ROLE) == USER],
+            "current": agent_input[CURRENT][QUERY],
+            "intent": intent,
+            "latency": latency
+        }) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def read_decision_log(path: str) -> list:
+    """
+    Read the decisions logged by `IntentDecisionLog`.
+
+    Malformed lines and decisions without an intent are skipped.
+
+    Args:
+        path (str): Log file.
+
+    Returns:
+        list: Decision records, oldest first.
+    """
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("intent") and isinstance(record.get("current"), str):
+                record.setdefault("history", [])
+                records.append(record)
+    return records
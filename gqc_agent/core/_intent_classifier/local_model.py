@@ -0,0 +1,270 @@
+import json
+import math
+import random
+import re
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install "gqc-agent[local-intent]"
+    np = None
+
+INTENT_LABELS = ("greeting", "search", "tool_call", "ambiguous")
+DEFAULT_N_FEATURES = 2 ** 18
+ARTIFACT_VERSION = 1
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The local intent model requires numpy. Install it with `pip install \"gqc-agent[local-intent]\"`.")
+
+
+def extract_features(current: str, history: list) -> list:
+    """
+    Turn a query and the previous user queries into hashed-feature names.
+
+    Args:
+        current (str): Current user query.
+        history (list): Previous user query strings, oldest first.
+
+    Returns:
+        list: Feature strings: word unigrams and bigrams and character trigrams of the
+              current query, unigrams of the last history query, and a few shape features.
+    """
+    text = current.lower().strip()
+    tokens = _TOKEN_PATTERN.findall(text)
+    features = ["bias"]
+    features += [f"w:{t}" for t in tokens]
+    features += [f"b:{a} {b}" for a, b in zip(["<s>"] + tokens, tokens + ["</s>"])]
+    for token in tokens:
+        padded = f"^{token}$"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    features.append(f"len:{min(len(tokens), 8)}")
+    if text.endswith("?"):
+        features.append("shape:question")
+    if history:
+        features.append("shape:has_history")
+        features += [f"h:{t}" for t in _TOKEN_PATTERN.findall(history[-1].lower())]
+    return features
+
+
+def _hash_features(features: list, n_features: int) -> list:
+    # crc32 is stable across processes, unlike hash()
+    return [zlib.crc32(f.encode("utf-8")) % n_features for f in features]
+
+
+class LocalIntentModel:
+    """
+    Hashed n-gram multinomial logistic regression over the four intent labels.
+
+    Trained on `(history, current) -> intent` decisions logged from the LLM classifier
+    (see `IntentDecisionLog`), so it answers the easy cases locally in microseconds.
+    Requires numpy.
+
+    Attributes:
+        labels (tuple): Intent labels, in weight-matrix column order.
+        n_features (int): Size of the hashed feature space.
+        mean_llm_latency (float): Mean LLM classification latency (seconds) seen in the
+                                  training log; the initial estimate of the latency saved
+                                  per locally served request.
+    """
+    def __init__(self, labels=INTENT_LABELS, n_features: int = DEFAULT_N_FEATURES):
+        _require_numpy()
+        self.labels = tuple(labels)
+        self.n_features = n_features
+        self.mean_llm_latency = 0.0
+        self.weights = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def _encode(self, examples: list):
+        """
+        Encode (current, history) pairs as a sparse row-major matrix.
+
+        Returns:
+            tuple: (indices, values, row_starts). Rows are L2-normalized.
+        """
+        indices, values, row_starts = [], [], []
+        for current, history in examples:
+            row = _hash_features(extract_features(current, history), self.n_features)
+            row_starts.append(len(indices))
+            indices += row
+            values += [1.0 / math.sqrt(len(row))] * len(row)
+        return (np.asarray(indices, dtype=np.int64), np.asarray(values, dtype=np.float32),
+                np.asarray(row_starts, dtype=np.int64))
+
+    def _logits(self, indices, values, row_starts):
+        # Every row has the "bias" feature, so no row is empty for reduceat
+        return np.add.reduceat(self.weights[indices] * values[:, None], row_starts, axis=0) + self.bias
+
+    @staticmethod
+    def _softmax(logits):
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def fit(self, records: list, epochs: int = 300, learning_rate: float = 2.0, l2: float = 1e-4):
+        """
+        Train on logged decisions with full-batch gradient descent.
+
+        Args:
+            records (list): Decision records, as returned by `read_decision_log`.
+            epochs (int): Gradient steps.
+            learning_rate (float): Step size.
+            l2 (float): L2 regularization strength.
+
+        Returns:
+            LocalIntentModel: self.
+
+        Raises:
+            ValueError: If there are no usable records.
+        """
+        records = [r for r in records if r["intent"] in self.labels]
+        if not records:
+            raise ValueError("No decision records with a known intent to train on")
+
+        indices, values, row_starts = self._encode([(r["current"], r["history"]) for r in records])
+        rows = np.repeat(np.arange(len(records)), np.diff(np.append(row_starts, len(indices))))
+        targets = np.zeros((len(records), len(self.labels)), dtype=np.float32)
+        targets[np.arange(len(records)), [self.labels.index(r["intent"]) for r in records]] = 1.0
+
+        self.weights[:] = 0.0
+        self.bias[:] = 0.0
+        for _ in range(epochs):
+            error = (self._softmax(self._logits(indices, values, row_starts)) - targets) / len(records)
+            grad = np.zeros_like(self.weights)
+            np.add.at(grad, indices, error[rows] * values[:, None])
+            self.weights -= learning_rate * (grad + l2 * self.weights)
+            self.bias -= learning_rate * error.sum(axis=0)
+
+        latencies = [r["latency"] for r in records if r.get("latency")]
+        self.mean_llm_latency = sum(latencies) / len(latencies) if latencies else 0.0
+        return self
+
+    def predict_proba(self, current: str, history: list = None) -> dict:
+        """
+        Return the probability of every intent label.
+
+        Args:
+            current (str): Current user query.
+            history (list, optional): Previous user query strings, oldest first.
+
+        Returns:
+            dict: label -> probability.
+        """
+        probabilities = self._softmax(self._logits(*self._encode([(current, history or [])])))[0]
+        return {label: float(p) for label, p in zip(self.labels, probabilities)}
+
+    def predict(self, current: str, history: list = None) -> tuple:
+        """
+        Return the most likely intent and its probability.
+
+        Args:
+            current (str): Current user query.
+            history (list, optional): Previous user query strings, oldest first.
+
+        Returns:
+            tuple: (intent, confidence).
+        """
+        probabilities = self.predict_proba(current, history)
+        intent = max(probabilities, key=probabilities.get)
+        return intent, probabilities[intent]
+
+    def evaluate(self, records: list, threshold: float = 0.9) -> dict:
+        """
+        Compare the model's predictions with logged LLM decisions.
+
+        Args:
+            records (list): Decision records, as returned by `read_decision_log`.
+            threshold (float): Confidence at or above which the pipeline serves a prediction locally.
+
+        Returns:
+            dict: {
+                "examples": int,
+                "agreement": float,            # over all records
+                "coverage": float,             # share of records served locally at `threshold`
+                "served_agreement": float,     # agreement on the records served locally
+                "latency_saved_per_request": float  # seconds, from the logged LLM latencies
+            }
+        """
+        records = [r for r in records if r["intent"] in self.labels]
+        if not records:
+            return {"examples": 0, "agreement": 0.0, "coverage": 0.0, "served_agreement": 0.0,
+                    "latency_saved_per_request": 0.0}
+
+        probabilities = self._softmax(self._logits(*self._encode([(r["current"], r["history"]) for r in records])))
+        predicted = probabilities.argmax(axis=1)
+        agreed = np.asarray([self.labels.index(r["intent"]) for r in records]) == predicted
+        served = probabilities.max(axis=1) >= threshold
+        saved = sum(r.get("latency") or self.mean_llm_latency for r, s in zip(records, served) if s)
+        return {
+            "examples": len(records),
+            "agreement": float(agreed.mean()),
+            "coverage": float(served.mean()),
+            "served_agreement": float(agreed[served].mean()) if served.any() else 0.0,
+            "latency_saved_per_request": saved / len(records)
+        }
+
+    def save(self, path: str):
+        """
+        Save the model artifact (a .npz file).
+
+        Args:
+            path (str): Destination file.
+        """
+        meta = {"version": ARTIFACT_VERSION, "labels": list(self.labels), "n_features": self.n_features,
+                "mean_llm_latency": self.mean_llm_latency}
+        with open(path, "wb") as f:
+            np.savez_compressed(f, weights=self.weights, bias=self.bias, meta=np.asarray(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentModel":
+        """
+        Load a model artifact written by `save`.
+
+        Args:
+            path (str): Artifact file.
+
+        Returns:
+            LocalIntentModel: Loaded model.
+
+        Raises:
+            ValueError: If the artifact version is not supported.
+        """
+        _require_numpy()
+        with np.load(path, allow_pickle=False) as artifact:
+            meta = json.loads(str(artifact["meta"]))
+            if meta.get("version") != ARTIFACT_VERSION:
+                raise ValueError(f"Unsupported local intent model version: {meta.get('version')}")
+            model = cls(labels=meta["labels"], n_features=meta["n_features"])
+            model.weights = artifact["weights"]
+            model.bias = artifact["bias"]
+        model.mean_llm_latency = meta.get("mean_llm_latency", 0.0)
+        return model
+
+
+def train_local_intent_model(records: list, holdout: float = 0.2, threshold: float = 0.9, seed: int = 0, **fit_options) -> tuple:
+    """
+    Train a `LocalIntentModel` and measure it on a held-out share of the records.
+
+    Args:
+        records (list): Decision records, as returned by `read_decision_log`.
+        holdout (float): Share of records kept out of training for the report.
+        threshold (float): Confidence threshold used for the report.
+        seed (int): Shuffle seed.
+        **fit_options: Passed to `LocalIntentModel.fit`.
+
+    Returns:
+        tuple: (model, report). The model is refitted on all records; `report` is the
+               `evaluate` output on the held-out records.
+    """
+    records = list(records)
+    random.Random(seed).shuffle(records)
+    n_holdout = int(len(records) * holdout)
+    evaluation = records[:n_holdout]
+    model = LocalIntentModel().fit(records[n_holdout:], **fit_options)
+    report = model.evaluate(evaluation, threshold)
+    if n_holdout:
+        model.fit(records, **fit_options)
+    return model, report
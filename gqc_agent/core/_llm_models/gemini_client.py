@@ -1,6 +1,6 @@
 from google.genai import types
 import json
-def call_gemini(client, model, system_prompt: str, user_prompt: str) -> str:
+def call_gemini(client, model, system_prompt: str, user_prompt: str, temperature: float = None, max_output_tokens: int = None) -> str:
     """
     Generate a JSON response using a Gemini language model.
 
@@ -9,6 +9,8 @@ def call_gemini(client, model, system_prompt: str, user_prompt: str) -> str:
         model (str): Gemini model name.
         system_prompt (str): System instructions.
         user_prompt (str): User query.
+        temperature (float, optional): Sampling temperature. Defaults to the model's default.
+        max_output_tokens (int, optional): Upper bound on generated tokens.
 
     Returns:
         dict: JSON response from Gemini. If parsing fails, returns {"intent": "ambiguous"}.
@@ -17,7 +19,9 @@ def call_gemini(client, model, system_prompt: str, user_prompt: str) -> str:
     chat = client.chats.create(
         model=model,
         config=types.GenerateContentConfig(
-        response_mime_type="application/json"
+        response_mime_type="application/json",
+        temperature=temperature,
+        max_output_tokens=max_output_tokens
     )
     )
     response = chat.send_message(
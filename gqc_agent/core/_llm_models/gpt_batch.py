@@ -0,0 +1,75 @@
+import io
+import json
+import time
+from gqc_agent.core._llm_models.gpt_client import build_gpt_request
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+FINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def submit_gpt_batch(client, model, items: list, generation_config: dict = None) -> str:
+    """
+    Upload completions to the OpenAI Batch API and start the batch, without waiting for it.
+
+    Batch requests are billed at a discount but finish asynchronously (within 24h),
+    so this is meant for offline reprocessing, not interactive traffic.
+
+    Args:
+        client: Initialized GPT client object.
+        model (str): GPT model name.
+        items (list): (custom_id, system_prompt, user_prompt) tuples.
+        generation_config (dict, optional): {"temperature": float, "max_output_tokens": int} for every request.
+
+    Returns:
+        str: Batch id, to pass to `wait_gpt_batch` (possibly from a later process).
+    """
+    lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": build_gpt_request(model, system_prompt, user_prompt, **(generation_config or {}))
+        })
+        for custom_id, system_prompt, user_prompt in items
+    ]
+    input_file = client.files.create(
+        file=("gqc_batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+        purpose="batch"
+    )
+    batch = client.batches.create(input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h")
+    return batch.id
+
+
+def wait_gpt_batch(client, batch_id: str, poll_interval: float = 30.0) -> dict:
+    """
+    Wait for a submitted batch to finish and read its results.
+
+    Args:
+        client: Initialized GPT client object.
+        batch_id (str): Id returned by `submit_gpt_batch`.
+        poll_interval (float): Seconds between status checks.
+
+    Returns:
+        dict: custom_id -> JSON string returned by the model. Failed requests are missing.
+
+    Raises:
+        RuntimeError: If the batch as a whole failed, expired or was cancelled.
+    """
+    batch = client.batches.retrieve(batch_id)
+    while batch.status not in FINAL_BATCH_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch_id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"GPT batch {batch_id} ended with status '{batch.status}'")
+
+    results = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return results
@@ -1,6 +1,34 @@
 import json
 
-def call_gpt(client, model, system_prompt: str, user_prompt: str) -> str:
+def build_gpt_request(model, system_prompt: str, user_prompt: str, temperature: float = None, max_output_tokens: int = None) -> dict:
+    """
+    Build the chat completion request body used for every GQC agent.
+
+    Args:
+        model (str): GPT model name.
+        system_prompt (str): System instructions.
+        user_prompt (str): User query.
+        temperature (float, optional): Sampling temperature. Defaults to 0.
+        max_output_tokens (int, optional): Upper bound on generated tokens. Defaults to the model's limit.
+
+    Returns:
+        dict: Keyword arguments for `client.chat.completions.create` (also the Batch API request body).
+    """
+    request = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt.strip()},
+            {"role": "user", "content": json.dumps(user_prompt)}
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0 if temperature is None else temperature
+    }
+    if max_output_tokens is not None:
+        request["max_completion_tokens"] = max_output_tokens
+    return request
+
+
+def call_gpt(client, model, system_prompt: str, user_prompt: str, temperature: float = None, max_output_tokens: int = None) -> str:
     """
     Generate a JSON response using a GPT language model.
 
@@ -9,20 +37,14 @@ def call_gpt(client, model, system_prompt: str, user_prompt: str) -> str:
         model (str): GPT model name.
         system_prompt (str): System instructions.
         user_prompt (str): User query.
+        temperature (float, optional): Sampling temperature. Defaults to 0.
+        max_output_tokens (int, optional): Upper bound on generated tokens.
 
     Returns:
         dict: JSON response from GPT. If parsing fails, returns {"intent": "ambiguous"}.
     """
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt.strip()},
-            {"role": "user", "content": json.dumps(user_prompt)}
-        ],
-        response_format={"type": "json_object"},
-        temperature=0
-    )
+    response = client.chat.completions.create(**build_gpt_request(model, system_prompt, user_prompt, temperature, max_output_tokens))
 
     return response.choices[0].message.content
 
@@ -0,0 +1,107 @@
+from gqc_agent.core._llm_models.gpt_client import call_gpt
+from gqc_agent.core._llm_models.gemini_client import call_gemini
+from gqc_agent.core._llm_models.stub_client import call_stub, submit_stub_batch, wait_stub_batch
+from gqc_agent.core._llm_models.gpt_batch import submit_gpt_batch, wait_gpt_batch
+
+
+def _dispatch(client, model: str, provider: str, system_prompt: str, user_prompt: str, generation_config: dict = None) -> str:
+    generation_config = generation_config or {}
+    # -----------------------------
+    # Auto route based on provider
+    # -----------------------------
+    if provider.lower() == "gpt":
+
+        return call_gpt(client, model, system_prompt, user_prompt, **generation_config)
+
+    elif provider.lower() == "gemini":
+
+        return call_gemini(client, model, system_prompt, user_prompt, **generation_config)
+
+    elif provider.lower() == "stub":
+
+        return call_stub(client, model, system_prompt, user_prompt, **generation_config)
+
+    else:
+        raise ValueError("No valid API key provided or unknown model provider")
+
+
+def _call_key(client, model: str, provider: str, system_prompt: str, user_prompt: str, generation_config: dict = None):
+    # The client is part of the identity: two pipelines with different API keys never share calls
+    generation_key = tuple(sorted((generation_config or {}).items()))
+    return id(client), provider.lower(), model, generation_key, system_prompt, user_prompt
+
+
+def call_llm(client, model: str, provider: str, system_prompt: str, user_prompt: str, single_flight=None, generation_config: dict = None) -> str:
+    """
+    Route one completion to the provider's client.
+
+    Args:
+        client: Initialized LLM client (OpenAI, Gemini or stub client object).
+        model (str): Model name.
+        provider (str): LLM provider, one of "gpt", "gemini" or "stub".
+        system_prompt (str): System instructions.
+        user_prompt (str): User query.
+        single_flight (SingleFlight, optional): When given, identical concurrent calls
+                                               share one provider request.
+        generation_config (dict, optional): {"temperature": float, "max_output_tokens": int}.
+
+    Returns:
+        str: Raw JSON string returned by the model.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    if single_flight is None:
+        return _dispatch(client, model, provider, system_prompt, user_prompt, generation_config)
+    key = _call_key(client, model, provider, system_prompt, user_prompt, generation_config)
+    return single_flight.do(key, _dispatch, client, model, provider, system_prompt, user_prompt, generation_config)
+
+
+def submit_llm_batch(client, model: str, provider: str, items: list, generation_config: dict = None) -> str:
+    """
+    Submit many completions to the provider's asynchronous Batch API, without waiting.
+
+    Args:
+        client: Initialized LLM client (OpenAI or stub client object).
+        model (str): Model name.
+        provider (str): LLM provider, either "gpt" or "stub".
+        items (list): (custom_id, system_prompt, user_prompt) tuples.
+        generation_config (dict, optional): {"temperature": float, "max_output_tokens": int}.
+
+    Returns:
+        str: Provider batch id, to pass to `wait_llm_batch`.
+
+    Raises:
+        ValueError: If the provider has no supported Batch API.
+    """
+    if provider.lower() == "gpt":
+        return submit_gpt_batch(client, model, items, generation_config)
+    elif provider.lower() == "stub":
+        return submit_stub_batch(client, model, items, generation_config)
+    else:
+        raise ValueError(f"Batch API mode is not supported for provider '{provider}'")
+
+
+def wait_llm_batch(client, provider: str, batch_id: str, poll_interval: float = 30.0) -> dict:
+    """
+    Wait for a batch submitted with `submit_llm_batch` and read its results.
+
+    Args:
+        client: Initialized LLM client (OpenAI or stub client object).
+        provider (str): LLM provider, either "gpt" or "stub".
+        batch_id (str): Provider batch id.
+        poll_interval (float): Seconds between batch status checks.
+
+    Returns:
+        dict: custom_id -> raw JSON string. Requests that failed are missing.
+
+    Raises:
+        ValueError: If the provider has no supported Batch API.
+        RuntimeError: If the batch failed, expired or was cancelled.
+    """
+    if provider.lower() == "gpt":
+        return wait_gpt_batch(client, batch_id, poll_interval)
+    elif provider.lower() == "stub":
+        return wait_stub_batch(client, batch_id, poll_interval)
+    else:
+        raise ValueError(f"Batch API mode is not supported for provider '{provider}'")
@@ -0,0 +1,217 @@
+import json
+import threading
+from concurrent.futures import Future
+from gqc_agent.core._llm_models.llm_router import call_llm, _call_key
+from gqc_agent.core._metrics.metrics import metrics
+
+BATCH_INSTRUCTIONS = """
+
+# Batched Requests
+The user message contains several independent requests. Each one starts with a line `### Request <id>`.
+Handle every request on its own, exactly as described above, without mixing information between requests.
+Respond with a single JSON object of the form:
+{"results": [{"id": "<id>", ...the JSON fields you would return for that request alone...}, ...]}
+Return exactly one entry per request, using the request ids as given.
+"""
+
+# Set as a caller's result when its item must be retried on its own
+_RETRY = object()
+
+
+def build_batch_prompts(system_prompt: str, user_prompts: list) -> tuple:
+    """
+    Combine several single-item prompts into one multi-item prompt.
+
+    Args:
+        system_prompt (str): System prompt shared by every item.
+        user_prompts (list): User prompt of every item; item ids are their positions.
+
+    Returns:
+        tuple: (system_prompt, user_prompt) of the batched request.
+    """
+    user_prompt = "\n\n".join(f"### Request {i}\n{prompt.strip()}" for i, prompt in enumerate(user_prompts))
+    return system_prompt + BATCH_INSTRUCTIONS, user_prompt
+
+
+def parse_batch_response(response: str, size: int, output_key: str) -> list:
+    """
+    Scatter a batched response back to its items.
+
+    Args:
+        response (str): JSON returned by the model.
+        size (int): Number of items in the batch.
+        output_key (str): Field every item answer must contain, e.g. "intent".
+
+    Returns:
+        list: Single-item JSON string per item, or None where the answer is missing or malformed.
+    """
+    answers = [None] * size
+    try:
+        results = json.loads(response).get("results")
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        return answers
+    if not isinstance(results, list):
+        return answers
+    for result in results:
+        if not isinstance(result, dict) or output_key not in result:
+            continue
+        try:
+            index = int(result.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < size and answers[index] is None:
+            answers[index] = json.dumps({key: value for key, value in result.items() if key != "id"})
+    return answers
+
+
+class MicroBatcher:
+    """
+    Merge concurrent calls of one agent into multi-item provider requests.
+
+    Calls arriving within `max_wait_ms` of the first pending one (or until
+    `max_batch_size` calls are pending) are sent as one prompt asking for a keyed
+    JSON array of answers, which are then handed back to each caller. Items whose
+    answer is missing or malformed are retried individually by their caller.
+
+    With `single_flight`, every call goes through `SingleFlight.do` under the key of
+    the equivalent single call before it joins a batch: a cached result is returned
+    without calling the provider, an identical call in flight (batched or not) is
+    joined, and the answer is cached like a single call's.
+
+    Attributes:
+        name (str): Agent name, used as the metrics label.
+        output_key (str): Field every answer must contain, e.g. "intent".
+        max_batch_size (int): Items per provider request.
+        max_wait_ms (float): Longest time the first item of a batch waits for others.
+        batches (int): Provider requests sent (including single-item ones).
+        items (int): Items submitted.
+        retries (int): Items retried individually after a missing or malformed answer.
+    """
+    def __init__(self, name: str, output_key: str, client, model: str, provider: str, max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, generation_config: dict = None, single_flight=None):
+        if max_batch_size < 1 or max_wait_ms < 0:
+            raise ValueError("`max_batch_size` must be at least 1 and `max_wait_ms` cannot be negative")
+        self.name = name
+        self.output_key = output_key
+        self.client = client
+        self.model = model
+        self.provider = provider
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.generation_config = generation_config or {}
+        self.single_flight = single_flight
+        self.batches = 0
+        self.items = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def submit(self, system_prompt: str, user_prompt: str) -> str:
+        """
+        Add one call to the current batch and wait for its answer.
+
+        Args:
+            system_prompt (str): System instructions of the agent.
+            user_prompt (str): User prompt of this call.
+
+        Returns:
+            str: Raw JSON string, as returned by `call_llm` for a single call.
+        """
+        if self.single_flight is None:
+            return self._submit(system_prompt, user_prompt)
+        key = _call_key(self.client, self.model, self.provider, system_prompt, user_prompt, self.generation_config)
+        return self.single_flight.do(key, self._submit, system_prompt, user_prompt)
+
+    def _submit(self, system_prompt: str, user_prompt: str) -> str:
+        future = Future()
+        with self._lock:
+            self.items += 1
+            batch = self._pending
+            batch.append((system_prompt, user_prompt, future))
+            full = len(batch) >= self.max_batch_size
+            if full:
+                self._pending = []
+            elif len(batch) == 1:
+                timer = threading.Timer(self.max_wait_ms / 1000, self._flush, args=(batch,))
+                timer.daemon = True
+                timer.start()
+
+        if full:
+            self._send(batch)
+        result = future.result()
+        if result is _RETRY:
+            with self._lock:
+                self.retries += 1
+            metrics.inc("gqc_microbatch_retries_total", agent=self.name)
+            return self._call(system_prompt, user_prompt)
+        return result
+
+    def _flush(self, batch: list):
+        with self._lock:
+            if self._pending is not batch:
+                return  # already sent because it filled up
+            self._pending = []
+        self._send(batch)
+
+    def _call(self, system_prompt: str, user_prompt: str) -> str:
+        # Not through single_flight: `submit` already holds this call's in-flight entry
+        return call_llm(self.client, self.model, self.provider, system_prompt, user_prompt, generation_config=self.generation_config)
+
+    def _send(self, batch: list):
+        """Send one batch (grouped by system prompt) and resolve every caller's future."""
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[0], []).append(item)
+
+        for system_prompt, items in groups.items():
+            with self._lock:
+                self.batches += 1
+            metrics.inc("gqc_microbatch_batches_total", agent=self.name)
+            metrics.inc("gqc_microbatch_items_total", len(items), agent=self.name)
+            metrics.observe("gqc_microbatch_fill_ratio", len(items) / self.max_batch_size, agent=self.name)
+
+            # Identical prompts are sent once and share the answer
+            prompts = list(dict.fromkeys(item[1] for item in items))
+            if len(prompts) == 1:
+                try:
+                    result = self._call(system_prompt, prompts[0])
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for _, _, future in items:
+                    future.set_result(result)
+                continue
+
+            generation_config = dict(self.generation_config)
+            if generation_config.get("max_output_tokens"):
+                # The token budget is per answer
+                generation_config["max_output_tokens"] *= len(prompts)
+            batch_system_prompt, batch_user_prompt = build_batch_prompts(system_prompt, prompts)
+            try:
+                response = call_llm(self.client, self.model, self.provider, batch_system_prompt, batch_user_prompt,
+                                    generation_config=generation_config)
+                answers = parse_batch_response(response, len(prompts), self.output_key)
+            except Exception as e:
+                print(f"Micro-batch call for {self.name} failed, retrying items individually: {e}")
+                answers = [None] * len(prompts)
+
+            answer_by_prompt = dict(zip(prompts, answers))
+            for _, user_prompt, future in items:
+                answer = answer_by_prompt[user_prompt]
+                future.set_result(answer if answer is not None else _RETRY)
+
+    def stats(self) -> dict:
+        """
+        Return batching counters.
+
+        Returns:
+            dict: {"batches", "items", "retries", "mean_batch_size"}.
+        """
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "retries": self.retries,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0
+            }
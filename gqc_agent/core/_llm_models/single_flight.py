@@ -0,0 +1,116 @@
+import threading
+from concurrent.futures import Future
+from gqc_agent.core._metrics.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls into one.
+
+    While a call for a key is in flight, every other caller with the same key
+    waits on the same future and receives the same result (or exception).
+    The async server runs agents in worker threads, so a request served by
+    `run_gqc` and one served by the async server can be coalesced together.
+
+    Nothing is kept once the call completes, unless `cache` is given.
+
+    Attributes:
+        cache (MutableMapping, optional): Result store consulted before calling,
+            e.g. `cachetools.TTLCache`. None disables result caching.
+        calls (int): Calls that actually executed.
+        coalesced (int): Calls that were served by another in-flight call.
+        cache_hits (int): Calls served from `cache`.
+    """
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.calls = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _join(self, key):
+        """
+        Look up `key` in the cache and the in-flight table.
+
+        Returns:
+            tuple: (kind, value) where kind is "cached" (value is the result),
+                   "follower" (value is the leader's future) or "leader" (value is a new future).
+        """
+        with self._lock:
+            if self.cache is not None and key in self.cache:
+                self.cache_hits += 1
+                metrics.inc("gqc_llm_cache_hits_total")
+                return "cached", self.cache[key]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                metrics.inc("gqc_llm_coalesced_calls_total")
+                return "follower", future
+            future = Future()
+            self._in_flight[key] = future
+            self.calls += 1
+            metrics.inc("gqc_llm_calls_total")
+            return "leader", future
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error is None and self.cache is not None:
+                self.cache[key] = result
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run `func(*args, **kwargs)` unless an identical call is already in flight.
+
+        Args:
+            key: Hashable identity of the call.
+            func (callable): Blocking function to execute.
+
+        Returns:
+            Any: Result of the (possibly shared) call.
+        """
+        kind, value = self._join(key)
+        if kind == "cached":
+            return value
+        if kind == "follower":
+            return value.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, value, error=e)
+            raise
+        self._finish(key, value, result=result)
+        return result
+
+    def peek(self, key):
+        """
+        Return the cached result of `key` without calling anything.
+
+        Returns:
+            Any: Cached result, or None if there is no cache or no entry.
+        """
+        with self._lock:
+            if self.cache is None:
+                return None
+            return self.cache.get(key)
+
+    def stats(self) -> dict:
+        """
+        Return call counters.
+
+        Returns:
+            dict: {"calls": int, "coalesced": int, "cache_hits": int, "in_flight": int}
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "cache_hits": self.cache_hits,
+                "in_flight": len(self._in_flight)
+            }
@@ -0,0 +1,144 @@
+import json
+import re
+import threading
+import time
+import uuid
+
+STUB_MODELS = ["stub-small", "stub-large"]
+
+# Finished stub batch jobs, batch id -> results. Like a provider's job store it outlives
+# the client object, so a resumed run in the same process can pick a job up again.
+_BATCH_JOBS = {}
+_BATCH_JOBS_LOCK = threading.Lock()
+
+# Start of every item of a multi-item (micro-batched) user prompt
+_BATCH_ITEM_PATTERN = re.compile(r"^### Request (\S+)\s*$", re.MULTILINE)
+
+
+class StubClient:
+    """
+    Local stand-in for an LLM provider client.
+
+    Returns deterministic, well-formed JSON for every GQC agent without any
+    network access, so the pipeline, the server and the batch tooling can be
+    exercised end to end in tests and local development. Multi-item prompts
+    built by the micro-batcher get one keyed answer per item.
+
+    Attributes:
+        latency (float): Seconds to sleep on every call, to simulate a provider round-trip.
+        models (list): Model names reported by the stand-in catalog.
+        calls (int): Number of completions served so far.
+        batches (int): Number of batch jobs served so far.
+    """
+    def __init__(self, latency: float = 0.0, models: list = None):
+        self.latency = latency
+        self.models = list(models) if models else list(STUB_MODELS)
+        self.calls = 0
+        self.batches = 0
+
+    def complete(self, model: str, system_prompt: str, user_prompt: str) -> str:
+        """
+        Produce a JSON answer shaped after the output format requested by the system prompt.
+
+        Args:
+            model (str): Stub model name.
+            system_prompt (str): System instructions; used to detect which agent is calling.
+            user_prompt (str): User query.
+
+        Returns:
+            str: JSON string.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+
+        if '"results"' in system_prompt and _BATCH_ITEM_PATTERN.search(user_prompt):
+            parts = _BATCH_ITEM_PATTERN.split(user_prompt)[1:]
+            results = [
+                {"id": item_id, **json.loads(self._answer(system_prompt, item_prompt))}
+                for item_id, item_prompt in zip(parts[::2], parts[1::2])
+            ]
+            return json.dumps({"results": results})
+        return self._answer(system_prompt, user_prompt)
+
+    @staticmethod
+    def _answer(system_prompt: str, user_prompt: str) -> str:
+        current_query = user_prompt.strip().splitlines()[-1].strip() if user_prompt.strip() else ""
+
+        if '"rephrased_queries"' in system_prompt:
+            return json.dumps({"rephrased_queries": [current_query, f"Please clarify: {current_query}"]})
+        if '"notes"' in system_prompt:
+            return json.dumps({"notes": f"The user is asking: {current_query}"})
+        if '"intent"' in system_prompt:
+            lowered = current_query.lower()
+            if lowered.rstrip("!. ") in ("hi", "hello", "hey", "good morning", "thanks", "thank you"):
+                intent = "greeting"
+            elif lowered.startswith(("add ", "create ", "update ", "delete ", "send ", "i want to ")):
+                intent = "tool_call"
+            elif lowered:
+                intent = "search"
+            else:
+                intent = "ambiguous"
+            return json.dumps({"intent": intent})
+        return json.dumps({})
+
+
+def call_stub(client, model, system_prompt: str, user_prompt: str, temperature: float = None, max_output_tokens: int = None) -> str:
+    """
+    Generate a JSON response using the local stand-in provider.
+
+    Args:
+        client: Initialized StubClient object.
+        model (str): Stub model name.
+        system_prompt (str): System instructions.
+        user_prompt (str): User query.
+        temperature (float, optional): Accepted for parity with real providers; ignored.
+        max_output_tokens (int, optional): Accepted for parity with real providers; ignored.
+
+    Returns:
+        str: JSON response from the stand-in provider.
+    """
+    return client.complete(model, system_prompt, user_prompt)
+
+
+def submit_stub_batch(client, model, items: list, generation_config: dict = None) -> str:
+    """
+    Local stand-in for submitting a provider batch job. The job completes immediately.
+
+    Args:
+        client: Initialized StubClient object.
+        model (str): Stub model name.
+        items (list): (custom_id, system_prompt, user_prompt) tuples.
+        generation_config (dict, optional): Unused; kept for signature parity with real batch backends.
+
+    Returns:
+        str: Batch id, to pass to `wait_stub_batch`.
+    """
+    client.batches += 1
+    results = {custom_id: client.complete(model, system_prompt, user_prompt) for custom_id, system_prompt, user_prompt in items}
+    batch_id = f"stub-batch-{uuid.uuid4().hex}"
+    with _BATCH_JOBS_LOCK:
+        _BATCH_JOBS[batch_id] = results
+    return batch_id
+
+
+def wait_stub_batch(client, batch_id: str, poll_interval: float = 0.0) -> dict:
+    """
+    Local stand-in for waiting on a provider batch job.
+
+    Args:
+        client: Initialized StubClient object.
+        batch_id (str): Id returned by `submit_stub_batch`.
+        poll_interval (float): Unused; kept for signature parity with real batch backends.
+
+    Returns:
+        dict: custom_id -> JSON string returned by the stand-in provider.
+
+    Raises:
+        RuntimeError: If the job is unknown, e.g. it was submitted by another process.
+    """
+    with _BATCH_JOBS_LOCK:
+        results = _BATCH_JOBS.get(batch_id)
+    if results is None:
+        raise RuntimeError(f"Stub batch {batch_id} ended with status 'expired'")
+    return dict(results)
@@ -0,0 +1,18 @@
+def list_stub_models(client):
+    """
+    List all models served by the local stand-in provider.
+
+    Args:
+        client: Initialized StubClient object.
+
+    Returns:
+        list: List of stub model names.
+
+    Raises:
+        ValueError: If the client is missing.
+    """
+
+    if not client:
+        raise ValueError("Stub client is missing.")
+
+    return list(client.models)
@@ -0,0 +1,107 @@
+import threading
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process registry of counters, gauges and summaries.
+
+    Metric names follow the Prometheus convention and labels are passed as keyword
+    arguments. The registry can be read as a plain dict (`snapshot`) or rendered in
+    the Prometheus text exposition format (`render_prometheus`).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increase counter `name` by `value`."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set gauge `name` to `value`."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def add_gauge(self, name: str, value: float, **labels):
+        """Add `value` (may be negative) to gauge `name`."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation of summary `name` (count and sum)."""
+        key = self._key(name, labels)
+        with self._lock:
+            count, total = self._summaries.get(key, (0, 0.0))
+            self._summaries[key] = (count + 1, total + value)
+
+    def get(self, name: str, **labels):
+        """
+        Return the current value of a counter or gauge.
+
+        Returns:
+            float: Value, or 0 if the metric has not been recorded yet.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            return self._gauges.get(key, 0)
+
+    def snapshot(self) -> dict:
+        """
+        Return all metrics as a flat dict keyed by `name{label="value",...}`.
+
+        Summaries are reported as `<name>_count` and `<name>_sum`.
+        """
+        with self._lock:
+            out = {}
+            for (name, labels), value in list(self._counters.items()) + list(self._gauges.items()):
+                out[_format_series(name, labels)] = value
+            for (name, labels), (count, total) in self._summaries.items():
+                out[_format_series(f"{name}_count", labels)] = count
+                out[_format_series(f"{name}_sum", labels)] = total
+            return out
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text, one sample per line.
+        """
+        with self._lock:
+            lines = []
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted({n for n, _ in series}):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for (n, labels), value in sorted(series.items()):
+                        if n == name:
+                            lines.append(f"{_format_series(name, labels)} {value}")
+            for name in sorted({n for n, _ in self._summaries}):
+                lines.append(f"# TYPE {name} summary")
+                for (n, labels), (count, total) in sorted(self._summaries.items()):
+                    if n == name:
+                        lines.append(f"{_format_series(f'{name}_count', labels)} {count}")
+                        lines.append(f"{_format_series(f'{name}_sum', labels)} {total}")
+            return "\n".join(lines) + "\n"
+
+
+def _format_series(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+    return f"{name}{{{rendered}}}"
+
+
+# Process-wide default registry shared by the pipeline, the server and the batch runner
+metrics = MetricsRegistry()
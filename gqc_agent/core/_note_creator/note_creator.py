@@ -1,32 +1,18 @@
 from gqc_agent.core._system_prompts.loader import load_system_prompt
-from gqc_agent.core._llm_models.gpt_client import call_gpt
-from gqc_agent.core._llm_models.gemini_client import call_gemini
+from gqc_agent.core._llm_models.llm_router import call_llm
 import json
 from gqc_agent.core._constants.constants import CURRENT, HISTORY, ROLE, ASSISTANT, USER, QUERY, RESPONSE, NOTES_CREATOR_PROMPT
 
-def create_note(input_data: dict, model: str, provider: str, client, system_prompt_file=NOTES_CREATOR_PROMPT):
+def build_note_prompt(input_data: dict) -> str:
     """
-    Generate a contextual note based on current input and conversation history.
+    Build the user prompt sent to the note creator.
 
     Args:
         input_data (dict): Structured input with 'input', 'current', and 'history'.
-        model (str): LLM model name (GPT or Gemini).
-        client: Initialized LLM client (OpenAI or Gemini client object).
-        provider (str): LLM provider, either "gpt" or "gemini".
-        system_prompt_file (str): System prompt filename guiding note creation.
 
     Returns:
-        dict: JSON with {"notes": "<generated note>"}.
+        str: User prompt with the full conversation history and the current query.
     """
-    try:
-        system_prompt = load_system_prompt(system_prompt_file)
-    except FileNotFoundError:
-        print(f"System prompt file '{system_prompt_file}' not found.")
-        return {"notes:": None}
-    except Exception as e:
-        print(f"Error loading system prompt '{system_prompt_file}': {e}")
-        return {"notes:": None}
-
     # Combine conversation history into context
     history_text = ""
     for item in input_data.get(HISTORY, []):
@@ -38,7 +24,7 @@ def create_note(input_data: dict, model: str, provider: str, client, system_prom
     current_query = input_data[CURRENT][QUERY]
     # user_input_text = input_data.get("input", current_query)
 
-    user_prompt = f"""
+    return f"""
     Conversation History:
     {history_text}
 
@@ -47,19 +33,35 @@ def create_note(input_data: dict, model: str, provider: str, client, system_prom
     """
 
 
-    # -----------------------------
-    # Auto route based on API key
-    # -----------------------------
-    if provider.lower() == "gpt":
+def create_note(input_data: dict, model: str, provider: str, client, system_prompt_file=NOTES_CREATOR_PROMPT, single_flight=None, generation_config=None):
+    """
+    Generate a contextual note based on current input and conversation history.
 
-        response = call_gpt(client, model, system_prompt, user_prompt)
+    Args:
+        input_data (dict): Structured input with 'input', 'current', and 'history'.
+        model (str): LLM model name (GPT or Gemini).
+        client: Initialized LLM client (OpenAI or Gemini client object).
+        provider (str): LLM provider, one of "gpt", "gemini" or "stub".
+        system_prompt_file (str): System prompt filename guiding note creation.
+        single_flight (SingleFlight, optional): Coalesces identical concurrent provider calls.
+        generation_config (dict, optional): {"temperature": float, "max_output_tokens": int}.
+
+    Returns:
+        dict: JSON with {"notes": "<generated note>"}.
+    """
+    try:
+        system_prompt = load_system_prompt(system_prompt_file)
+    except FileNotFoundError:
+        print(f"System prompt file '{system_prompt_file}' not found.")
+        return {"notes:": None}
+    except Exception as e:
+        print(f"Error loading system prompt '{system_prompt_file}': {e}")
+        return {"notes:": None}
 
-    elif provider.lower() == "gemini":
+    user_prompt = build_note_prompt(input_data)
 
-        response = call_gemini(client, model, system_prompt, user_prompt)
 
-    else:
-        raise ValueError("No valid API key provided or unknown model provider")
+    response = call_llm(client, model, provider, system_prompt, user_prompt, single_flight, generation_config)
 
     return json.loads(response)
 
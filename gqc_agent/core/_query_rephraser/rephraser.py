@@ -1,11 +1,33 @@
 from gqc_agent.core._system_prompts.loader import load_system_prompt
-from gqc_agent.core._llm_models.gpt_client import call_gpt
-from gqc_agent.core._llm_models.gemini_client import call_gemini
+from gqc_agent.core._llm_models.llm_router import call_llm
 import json
 from gqc_agent.core._constants.constants import CURRENT, HISTORY, QUERY, ROLE, USER, QUERY_REPHRASOR_PROMPT
 
 
-def rephrase_query(user_input: dict, model: str, provider: str, client, system_prompt_file=QUERY_REPHRASOR_PROMPT):
+def build_rephrase_prompt(user_input: dict) -> str:
+    """
+    Build the user prompt sent to the query rephraser.
+
+    Args:
+        user_input (dict): Structured input with 'current' and 'history' queries.
+
+    Returns:
+        str: User prompt with the history user queries and the current query.
+    """
+    # Prepare context
+    history_queries = "\n".join([h[QUERY] for h in user_input.get(HISTORY, []) if h.get(ROLE) == USER])
+    current_query = user_input[CURRENT][QUERY]
+
+    return f"""
+    History:
+    {history_queries}
+
+    Current Query:
+    {current_query}
+    """
+
+
+def rephrase_query(user_input: dict, model: str, provider: str, client, system_prompt_file=QUERY_REPHRASOR_PROMPT, single_flight=None, generation_config=None, micro_batcher=None):
     """
     Rephrase a user query in context of history queries.
 
@@ -13,8 +35,12 @@ def rephrase_query(user_input: dict, model: str, provider: str, client, system_p
         user_input (dict): Structured input with 'current' and 'history' queries.
         model (str): LLM model to use (GPT or Gemini).
         client: Initialized LLM client (OpenAI or Gemini client object).
-        provider (str): LLM provider, either "gpt" or "gemini".
+        provider (str): LLM provider, one of "gpt", "gemini" or "stub".
         system_prompt_file (str): Filename of the system prompt.
+        single_flight (SingleFlight, optional): Coalesces identical concurrent provider calls.
+        generation_config (dict, optional): {"temperature": float, "max_output_tokens": int}.
+        micro_batcher (MicroBatcher, optional): Sends the call together with other concurrent
+                                                calls in one multi-item provider request.
 
     Returns:
         dict: JSON with {"rephrased_queries": ["Option 1", "Option 2"]}.
@@ -30,31 +56,13 @@ def rephrase_query(user_input: dict, model: str, provider: str, client, system_p
         return {"rephrased_queries": None}
         
 
-    # Prepare context
-    history_queries = "\n".join([h[QUERY] for h in user_input.get(HISTORY, []) if h.get(ROLE) == USER])
-    current_query = user_input[CURRENT][QUERY]
-
     # Create LLM prompt
-    user_prompt = f"""
-    History:
-    {history_queries}
-
-    Current Query:
-    {current_query}
-    """
-    # -----------------------------
-    # Auto route based on API key
-    # -----------------------------
-    if provider.lower() == "gpt":
-
-        response = call_gpt(client, model, system_prompt, user_prompt)
-
-    elif provider.lower() == "gemini":
-
-        response = call_gemini(client, model, system_prompt, user_prompt)
+    user_prompt = build_rephrase_prompt(user_input)
 
+    if micro_batcher is not None:
+        response = micro_batcher.submit(system_prompt, user_prompt)
     else:
-        raise ValueError("No valid API key provided or unknown model provider")
+        response = call_llm(client, model, provider, system_prompt, user_prompt, single_flight, generation_config)
 
     # LLM client should already return dict
     return json.loads(response)
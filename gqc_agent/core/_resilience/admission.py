@@ -0,0 +1,161 @@
+import asyncio
+import collections
+import contextlib
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from gqc_agent.core._metrics.metrics import metrics
+
+OVERLOADED_ERROR = "Service overloaded, retry later"
+
+
+class OverloadedError(Exception):
+    """Raised when a pipeline run is rejected by admission control."""
+
+
+class AdmissionController:
+    """
+    Bound the number of concurrent pipeline runs.
+
+    At most `max_in_flight` runs execute at once. Up to `max_queue` more wait, first
+    in first out, for at most `max_queue_wait_ms`; anything beyond that is rejected
+    immediately with `OverloadedError`, so a slow provider cannot pile up threads
+    and memory. Threaded (`admit`) and async (`aadmit`) callers share the same slots.
+
+    Attributes:
+        max_in_flight (int): Runs executing at once.
+        max_queue (int): Runs allowed to wait for a slot.
+        max_queue_wait_ms (float): Longest time a run waits for a slot.
+        in_flight (int): Runs currently executing.
+        rejected (int): Runs rejected so far.
+    """
+    def __init__(self, max_in_flight: int, max_queue: int = 100, max_queue_wait_ms: float = 1000.0):
+        if max_in_flight < 1 or max_queue < 0 or max_queue_wait_ms < 0:
+            raise ValueError("`max_in_flight` must be at least 1; `max_queue` and `max_queue_wait_ms` cannot be negative")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_queue_wait_ms = max_queue_wait_ms
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+
+    def _try_enter(self, queue: bool = True):
+        """
+        Take a slot, or join the queue.
+
+        Returns:
+            Future: None if a slot was taken, otherwise a future resolved once a slot is handed over.
+
+        Raises:
+            OverloadedError: If the queue is full, or no slot is free and `queue` is False.
+        """
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                metrics.set_gauge("gqc_admission_in_flight", self.in_flight)
+                return None
+            if not queue:
+                # Optional work declining a busy slot is not counted as a rejection
+                raise OverloadedError(OVERLOADED_ERROR)
+            if len(self._waiters) >= self.max_queue:
+                self._reject("queue_full")
+            waiter = Future()
+            self._waiters.append(waiter)
+            metrics.set_gauge("gqc_admission_queued", len(self._waiters))
+            return waiter
+
+    def _give_up(self, waiter: Future, reject: bool = True):
+        """
+        Leave the queue after a timeout (`reject`) or a cancellation.
+
+        Returns:
+            bool: True if the slot was handed over in the meantime and is now held.
+
+        Raises:
+            OverloadedError: If `reject` and no slot was handed over.
+        """
+        with self._lock:
+            if waiter.done():
+                return True  # the slot arrived just in time
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            metrics.set_gauge("gqc_admission_queued", len(self._waiters))
+            if reject:
+                self._reject("queue_timeout")
+            return False
+
+    def _reject(self, reason: str):
+        # Called with the lock held
+        self.rejected += 1
+        metrics.inc("gqc_admission_rejected_total", reason=reason)
+        raise OverloadedError(OVERLOADED_ERROR)
+
+    def _leave(self):
+        with self._lock:
+            # Hand the slot straight to the oldest waiter, if any
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(True)
+                    metrics.set_gauge("gqc_admission_queued", len(self._waiters))
+                    return
+            self.in_flight -= 1
+            metrics.set_gauge("gqc_admission_queued", 0)
+            metrics.set_gauge("gqc_admission_in_flight", self.in_flight)
+
+    @contextlib.contextmanager
+    def admit(self, queue: bool = True):
+        """
+        Hold a slot for the duration of the `with` block, waiting in the queue if needed.
+
+        Args:
+            queue (bool): Wait in the queue when no slot is free. False fails immediately
+                          instead, for optional work such as speculative runs.
+
+        Raises:
+            OverloadedError: If the queue is full or the wait exceeds `max_queue_wait_ms`
+                             (or no slot is free and `queue` is False).
+        """
+        waiter = self._try_enter(queue)
+        if waiter is not None:
+            try:
+                waiter.result(timeout=self.max_queue_wait_ms / 1000)
+            except FutureTimeoutError:
+                self._give_up(waiter)
+        try:
+            yield
+        finally:
+            self._leave()
+
+    @contextlib.asynccontextmanager
+    async def aadmit(self):
+        """
+        Async variant of `admit`.
+
+        Raises:
+            OverloadedError: If the queue is full or the wait exceeds `max_queue_wait_ms`.
+        """
+        waiter = self._try_enter()
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(waiter)), self.max_queue_wait_ms / 1000)
+            except asyncio.TimeoutError:
+                self._give_up(waiter)
+            except asyncio.CancelledError:
+                if self._give_up(waiter, reject=False):
+                    self._leave()
+                raise
+        try:
+            yield
+        finally:
+            self._leave()
+
+    def stats(self) -> dict:
+        """
+        Return admission counters.
+
+        Returns:
+            dict: {"in_flight", "queued", "rejected"}.
+        """
+        with self._lock:
+            return {"in_flight": self.in_flight, "queued": len(self._waiters), "rejected": self.rejected}
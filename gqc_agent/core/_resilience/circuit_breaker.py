@@ -0,0 +1,109 @@
+import collections
+import threading
+import time
+from gqc_agent.core._metrics.metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Value of the gqc_circuit_state gauge for each state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Keys accepted in the pipeline's `circuit_breaker` option
+CIRCUIT_BREAKER_KEYS = ("failure_rate", "slow_call_ms", "window", "min_calls", "open_seconds", "half_open_probes")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one provider/model.
+
+    The breaker watches the last `window` calls. It opens once at least `min_calls`
+    were seen and the share of failed calls reaches `failure_rate`. A call slower
+    than `slow_call_ms` counts as failed. While open, calls are refused without
+    contacting the provider. After `open_seconds` it half-opens and lets
+    `half_open_probes` calls through. If they all succeed the breaker closes;
+    any failure opens it again.
+
+    Attributes:
+        provider (str): Provider name, used as a metrics label.
+        model (str): Model name, used as a metrics label.
+        state (str): "closed", "open" or "half_open".
+    """
+    def __init__(self, provider: str, model: str, failure_rate: float = 0.5, slow_call_ms: float = None,
+                 window: int = 20, min_calls: int = 10, open_seconds: float = 30.0, half_open_probes: int = 1):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("`failure_rate` must be in (0, 1]")
+        if window < 1 or min_calls < 1 or half_open_probes < 1 or open_seconds < 0:
+            raise ValueError("`window`, `min_calls` and `half_open_probes` must be at least 1 and `open_seconds` cannot be negative")
+        self.provider = provider
+        self.model = model
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._outcomes = collections.deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_passed = 0
+        self._set_state(CLOSED)
+
+    def _set_state(self, state: str):
+        # Called with the lock held (or from __init__)
+        self.state = state
+        metrics.set_gauge("gqc_circuit_state", STATE_VALUES[state], provider=self.provider, model=self.model)
+
+    def _open(self):
+        self._set_state(OPEN)
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        metrics.inc("gqc_circuit_opened_total", provider=self.provider, model=self.model)
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go to the provider.
+
+        Every allowed call must be followed by `record`.
+
+        Returns:
+            bool: False while the breaker is open (or its half-open probes are taken).
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._set_state(HALF_OPEN)
+                self._probes_started = 0
+                self._probes_passed = 0
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes_started < self.half_open_probes:
+                self._probes_started += 1
+                return True
+            metrics.inc("gqc_circuit_rejected_total", provider=self.provider, model=self.model)
+            return False
+
+    def record(self, success: bool, latency: float):
+        """
+        Report the outcome of an allowed call.
+
+        Args:
+            success (bool): Whether the provider returned a usable answer.
+            latency (float): Call duration in seconds.
+        """
+        failed = not success or (self.slow_call_ms is not None and latency * 1000 > self.slow_call_ms)
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self._probes_passed += 1
+                    if self._probes_passed >= self.half_open_probes:
+                        self._set_state(CLOSED)
+                return
+            if self.state == OPEN:
+                return  # a call started before the breaker opened
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
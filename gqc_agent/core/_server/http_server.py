@@ -0,0 +1,531 @@
+import asyncio
+import json
+import multiprocessing
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from gqc_agent.core.orchestrator import AgentPipeline, build_pipeline
+from gqc_agent.core._metrics.metrics import metrics
+from gqc_agent.core._resilience.admission import OVERLOADED_ERROR
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_HEADERS = 100
+
+# Backoff between model catalog warm-up attempts, doubled after every failure
+WARMUP_RETRY_SECONDS = 1.0
+WARMUP_MAX_RETRY_SECONDS = 60.0
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    414: "URI Too Long",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+    503: "Service Unavailable"
+}
+
+
+class HTTPError(Exception):
+    """Error that is turned into an HTTP error response with a JSON body."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class GQCServer:
+    """
+    Async HTTP front end for a single AgentPipeline.
+
+    One instance runs per worker process. Endpoints:
+        POST /gqc          -> one `run_gqc` result
+        POST /gqc/batch    -> {"results": [...]} for {"inputs": [...]}
+        POST /gqc/stream   -> Server-Sent Events, one event per agent as it finishes
+        GET  /healthz      -> liveness probe
+        GET  /readyz       -> readiness probe (model catalog warmed, not draining)
+        GET  /metrics      -> Prometheus text format
+
+    Attributes:
+        pipeline (AgentPipeline): Pipeline used to serve requests.
+        batch_concurrency (int): Maximum conversations processed at once per batch request.
+        drain_timeout (float): Seconds to wait for in-flight requests on shutdown.
+        max_threads (int): Size of the thread pool running blocking provider calls.
+        keep_alive_timeout (float): Seconds an idle keep-alive connection waits for its next request.
+        read_timeout (float): Seconds allowed to receive the headers and body of a started request.
+        draining (bool): True once shutdown started; new pipeline requests get 503.
+    """
+    def __init__(self, pipeline: AgentPipeline, batch_concurrency: int = 16, drain_timeout: float = 30.0, max_threads: int = 64,
+                 keep_alive_timeout: float = 5.0, read_timeout: float = 30.0):
+        self.pipeline = pipeline
+        self.batch_concurrency = batch_concurrency
+        self.drain_timeout = drain_timeout
+        self.max_threads = max_threads
+        self.keep_alive_timeout = keep_alive_timeout
+        self.read_timeout = read_timeout
+        self.draining = False
+
+        self._server = None
+        self._stop_warmup = threading.Event()
+        self._in_flight = 0
+        self._idle = None
+        self._routes = {
+            "/gqc": ("POST", self._handle_gqc, True),
+            "/gqc/batch": ("POST", self._handle_batch, True),
+            "/gqc/stream": ("POST", self._handle_stream, True),
+            "/healthz": ("GET", self._handle_health, False),
+            "/readyz": ("GET", self._handle_ready, False),
+            "/metrics": ("GET", self._handle_metrics, False)
+        }
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    async def start(self, host: str, port: int, reuse_port: bool = False):
+        """
+        Start listening and warm the model catalog in the background, retrying until it succeeds.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind. 0 picks a free port.
+            reuse_port (bool): Set SO_REUSEPORT so several worker processes can share the port.
+
+        Returns:
+            asyncio.Server: The listening server.
+        """
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="gqc-agent"))
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, reuse_port=reuse_port or None
+        )
+        # Readiness flips once the catalog is fetched
+        threading.Thread(target=self._warm_until_ready, daemon=True).start()
+        return self._server
+
+    def _warm_until_ready(self):
+        """Warm the model catalog, with exponential backoff, until the pipeline is ready or the server drains."""
+        delay = WARMUP_RETRY_SECONDS
+        while not self._stop_warmup.is_set():
+            self.pipeline.warm_model_catalog()
+            if self.pipeline.is_ready():
+                return
+            metrics.inc("gqc_catalog_warmup_failures_total")
+            print(f"Model catalog not ready; retrying in {delay:g}s")
+            self._stop_warmup.wait(delay)
+            delay = min(delay * 2, WARMUP_MAX_RETRY_SECONDS)
+
+    async def drain(self):
+        """
+        Stop accepting connections and wait for in-flight requests to finish.
+
+        Waits at most `drain_timeout` seconds.
+        """
+        self.draining = True
+        self._stop_warmup.set()
+        if self._server is not None:
+            self._server.close()
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"Drain timeout reached with {self._in_flight} request(s) still in flight")
+
+    async def serve(self, host: str, port: int, reuse_port: bool = False):
+        """
+        Run until SIGTERM or SIGINT, then drain gracefully.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind.
+            reuse_port (bool): Set SO_REUSEPORT (multi-process mode).
+        """
+        await self.start(host, port, reuse_port)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                # Not supported on this platform / not in the main thread
+                pass
+        await stop.wait()
+        await self.drain()
+
+    def _enter(self):
+        self._in_flight += 1
+        self._idle.clear()
+        metrics.set_gauge("gqc_http_in_flight_requests", self._in_flight)
+
+    def _leave(self):
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._idle.set()
+        metrics.set_gauge("gqc_http_in_flight_requests", self._in_flight)
+
+    # -----------------------------
+    # HTTP plumbing
+    # -----------------------------
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader, self.keep_alive_timeout, self.read_timeout)
+                except HTTPError as he:
+                    await _write_response(writer, he.status, {"error": he.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close" and not self.draining
+                await self._dispatch(method, path, body, writer, keep_alive)
+                if not keep_alive or self.draining:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, writer, keep_alive: bool):
+        route = self._routes.get(path)
+        if route is None:
+            await _write_response(writer, 404, {"error": f"Unknown path: {path}"}, keep_alive)
+            return
+        expected_method, handler, tracked = route
+        if method != expected_method:
+            await _write_response(writer, 405, {"error": f"Use {expected_method} for {path}"}, keep_alive)
+            return
+        if tracked and self.draining:
+            await _write_response(writer, 503, {"error": "Server is shutting down"}, False)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        if tracked:
+            self._enter()
+        try:
+            status = await handler(body, writer, keep_alive)
+        except HTTPError as he:
+            status = he.status
+            await _write_response(writer, status, {"error": he.message}, keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            print(f"Error handling {method} {path}: {e}")
+            await _write_response(writer, 500, {"error": "Internal server error"}, keep_alive)
+        finally:
+            if tracked:
+                self._leave()
+            metrics.inc("gqc_http_requests_total", endpoint=path, status=status)
+            metrics.observe("gqc_http_request_duration_seconds", time.perf_counter() - started, endpoint=path)
+
+    # -----------------------------
+    # Endpoints
+    # -----------------------------
+    async def _handle_gqc(self, body: bytes, writer, keep_alive: bool) -> int:
+        user_input = _parse_json(body, dict)
+        result = await self.pipeline.arun_gqc(user_input)
+        status = _result_status(result)
+        await _write_response(writer, status, result, keep_alive)
+        return status
+
+    async def _handle_batch(self, body: bytes, writer, keep_alive: bool) -> int:
+        payload = _parse_json(body, dict)
+        inputs = payload.get("inputs")
+        if not isinstance(inputs, list):
+            raise HTTPError(400, "`inputs` must be a list of user inputs")
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run_one(user_input):
+            async with semaphore:
+                if not isinstance(user_input, dict):
+                    return {"error": "Invalid input format"}
+                return await self.pipeline.arun_gqc(user_input)
+
+        results = await asyncio.gather(*(run_one(item) for item in inputs))
+        metrics.inc("gqc_batch_items_total", len(inputs))
+        await _write_response(writer, 200, {"results": results}, keep_alive)
+        return 200
+
+    async def _handle_stream(self, body: bytes, writer, keep_alive: bool) -> int:
+        user_input = _parse_json(body, dict)
+        head = (
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/event-stream\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1"))
+
+        async def send_event(event: str, data):
+            chunk = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+            writer.write(f"{len(chunk):X}\r\n".encode("latin-1") + chunk + b"\r\n")
+            await writer.drain()
+
+        try:
+            async for key, value in self.pipeline.astream_gqc(user_input):
+                await send_event(key, value)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # Headers are already sent: report the failure inside the stream
+            print(f"Error streaming GQC result: {e}")
+            await send_event("error", "Internal server error")
+        await send_event("done", {})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return 200
+
+    async def _handle_health(self, body: bytes, writer, keep_alive: bool) -> int:
+        await _write_response(writer, 200, {"status": "ok"}, keep_alive)
+        return 200
+
+    async def _handle_ready(self, body: bytes, writer, keep_alive: bool) -> int:
+        if self.draining:
+            status, state = 503, "draining"
+        elif self.pipeline.is_ready():
+            status, state = 200, "ready"
+        else:
+            status, state = 503, "warming"
+        await _write_response(writer, status, {"status": state, "model": self.pipeline.model, "provider": self.pipeline.provider}, keep_alive)
+        return status
+
+    async def _handle_metrics(self, body: bytes, writer, keep_alive: bool) -> int:
+        text = metrics.render_prometheus().encode("utf-8")
+        await _write_raw(writer, 200, "text/plain; version=0.0.4", text, keep_alive)
+        return 200
+
+
+async def _readline(reader, too_long: HTTPError) -> bytes:
+    try:
+        return await reader.readline()
+    except ValueError:
+        # The line exceeds the stream buffer limit (64 KiB)
+        raise too_long
+
+
+async def _read_request(reader, idle_timeout: float, read_timeout: float):
+    """
+    Read one HTTP/1.1 request.
+
+    Args:
+        reader (asyncio.StreamReader): Connection to read from.
+        idle_timeout (float): Seconds to wait for the request line.
+        read_timeout (float): Seconds to receive the rest of the request once it started.
+
+    Returns:
+        tuple | None: (method, path, headers, body), or None when the peer closed the
+                      connection or stayed idle for `idle_timeout`.
+
+    Raises:
+        HTTPError: If the request is malformed, too large or too slow.
+    """
+    try:
+        request_line = await asyncio.wait_for(_readline(reader, HTTPError(414, "Request line too long")), idle_timeout)
+    except asyncio.TimeoutError:
+        return None
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise HTTPError(400, "Malformed request line")
+    method, target, _ = parts
+
+    try:
+        headers, body = await asyncio.wait_for(_read_headers_and_body(reader), read_timeout)
+    except asyncio.TimeoutError:
+        raise HTTPError(408, "Timed out reading the request")
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+async def _read_headers_and_body(reader) -> tuple:
+    headers = {}
+    while True:
+        line = await _readline(reader, HTTPError(431, "Request header line too large"))
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HTTPError(431, "Too many request headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    transfer_encoding = headers.get("transfer-encoding", "").lower()
+    if transfer_encoding:
+        if "content-length" in headers:
+            raise HTTPError(400, "Both Transfer-Encoding and Content-Length given")
+        if transfer_encoding != "chunked":
+            raise HTTPError(501, f"Unsupported Transfer-Encoding: {transfer_encoding}")
+        return headers, await _read_chunked_body(reader)
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return headers, body
+
+
+async def _read_chunked_body(reader) -> bytes:
+    """Read a `Transfer-Encoding: chunked` body, dropping chunk extensions and trailers."""
+    body = bytearray()
+    while True:
+        size_line = await _readline(reader, HTTPError(400, "Chunk size line too long"))
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPError(400, "Invalid chunk size")
+        if size < 0:
+            raise HTTPError(400, "Invalid chunk size")
+        if size == 0:
+            break
+        if len(body) + size > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body += await reader.readexactly(size)
+        if await reader.readexactly(2) != b"\r\n":
+            raise HTTPError(400, "Malformed chunk")
+    while True:
+        # Trailer fields, up to the blank line ending the body
+        line = await _readline(reader, HTTPError(431, "Request trailer line too large"))
+        if line in (b"\r\n", b"\n", b""):
+            return bytes(body)
+
+
+def _parse_json(body: bytes, expected_type):
+    try:
+        payload = json.loads(body or b"null")
+    except json.JSONDecodeError:
+        raise HTTPError(400, "Request body must be valid JSON")
+    if not isinstance(payload, expected_type):
+        raise HTTPError(400, f"Request body must be a JSON {expected_type.__name__}")
+    return payload
+
+
+def _result_status(result: dict) -> int:
+    if "error" not in result:
+        return 200
+    if result["error"] == OVERLOADED_ERROR:
+        return 503
+    return 400 if result["error"] == "Invalid input format" else 500
+
+
+async def _write_raw(writer, status: int, content_type: str, body: bytes, keep_alive: bool):
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _write_response(writer, status: int, payload, keep_alive: bool):
+    await _write_raw(writer, status, "application/json", json.dumps(payload).encode("utf-8"), keep_alive)
+
+
+def _worker_main(pipeline_config: dict, host: str, port: int, reuse_port: bool, server_options: dict):
+    pipeline = build_pipeline(pipeline_config)
+    server = GQCServer(pipeline, **server_options)
+    asyncio.run(server.serve(host, port, reuse_port))
+
+
+def run_server(api_key: str, model: str, provider: str, host: str = "127.0.0.1", port: int = 8000,
+               workers: int = 1, drain_timeout: float = 30.0, batch_concurrency: int = 16,
+               max_threads: int = 64, stub_latency: float = 0.0, agent_configs: dict = None,
+               local_intent_model: str = None, local_intent_threshold: float = 0.9, intent_log: str = None,
+               micro_batch_agents: list = None, micro_batch_size: int = 8, micro_batch_wait_ms: float = 10.0,
+               max_in_flight: int = None, max_queue: int = 100, max_queue_wait_ms: float = 1000.0,
+               circuit_breaker: dict = None, degraded_response: dict = None):
+    """
+    Serve the GQC pipeline over HTTP until SIGTERM/SIGINT.
+
+    With `workers > 1`, each worker is a separate process with its own pipeline and
+    event loop, all bound to the same port through SO_REUSEPORT. On shutdown every
+    worker stops accepting connections and drains its in-flight requests.
+
+    Args:
+        api_key (str): OpenAI or Gemini API key (unused for the "stub" provider).
+        model (str): Model name.
+        provider (str): "gpt", "gemini" or "stub".
+        host (str): Interface to bind.
+        port (int): Port to bind.
+        workers (int): Number of worker processes.
+        drain_timeout (float): Seconds each worker waits for in-flight requests on shutdown.
+        batch_concurrency (int): Conversations processed at once per /gqc/batch request.
+        max_threads (int): Per-worker thread pool size for blocking provider calls.
+        stub_latency (float): Simulated provider latency in seconds for the "stub" provider.
+        agent_configs (dict, optional): Per-agent provider/model/generation overrides
+                                        (see `AgentPipeline`).
+        local_intent_model (str, optional): Path of a saved `LocalIntentModel` artifact.
+        local_intent_threshold (float): Confidence needed to serve a local intent prediction.
+        intent_log (str, optional): JSONL file receiving every LLM intent decision.
+        micro_batch_agents (list, optional): Agents whose concurrent calls are merged into
+                                             multi-item provider requests (see `AgentPipeline`).
+        micro_batch_size (int): Items per micro-batched request.
+        micro_batch_wait_ms (float): Longest time a call waits for others to join its batch.
+        max_in_flight (int, optional): Pipeline runs executing at once per worker; excess runs
+                                       queue and are rejected with 503 when the queue is full.
+        max_queue (int): Runs allowed to wait for a slot per worker.
+        max_queue_wait_ms (float): Longest time a run waits for a slot.
+        circuit_breaker (dict, optional): Per provider/model circuit breaker settings (see `AgentPipeline`).
+        degraded_response (dict, optional): Agent outputs returned while a breaker is open.
+
+    Raises:
+        ValueError: If `workers` is invalid or multi-process mode is unsupported on this platform.
+    """
+    if workers < 1:
+        raise ValueError("`workers` must be at least 1")
+    if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("Multiple workers require SO_REUSEPORT support on this platform")
+
+    pipeline_config = {"api_key": api_key, "model": model, "provider": provider, "stub_latency": stub_latency,
+                       "agent_configs": agent_configs, "local_intent_model": local_intent_model,
+                       "local_intent_threshold": local_intent_threshold, "intent_log": intent_log,
+                       "micro_batch_agents": micro_batch_agents, "micro_batch_size": micro_batch_size,
+                       "micro_batch_wait_ms": micro_batch_wait_ms, "max_in_flight": max_in_flight,
+                       "max_queue": max_queue, "max_queue_wait_ms": max_queue_wait_ms,
+                       "circuit_breaker": circuit_breaker, "degraded_response": degraded_response}
+    server_options = {"batch_concurrency": batch_concurrency, "drain_timeout": drain_timeout, "max_threads": max_threads}
+
+    if workers == 1:
+        print(f"Serving GQC agent on http://{host}:{port} (1 worker)")
+        _worker_main(pipeline_config, host, port, False, server_options)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_main, args=(pipeline_config, host, port, True, server_options), name=f"gqc-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"Serving GQC agent on http://{host}:{port} ({workers} workers)")
+
+    stop = threading.Event()
+    previous_handlers = {sig: signal.signal(sig, lambda *_: stop.set()) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        while not stop.is_set() and any(p.is_alive() for p in processes):
+            stop.wait(0.5)
+    finally:
+        # Forward shutdown so every worker drains, then reap them
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(drain_timeout + 5)
+            if process.is_alive():
+                process.kill()
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
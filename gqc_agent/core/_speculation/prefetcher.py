@@ -0,0 +1,276 @@
+import collections
+import contextlib
+import difflib
+import json
+import math
+import re
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from gqc_agent.core._intent_classifier.classifier import build_intent_prompt
+from gqc_agent.core._query_rephraser.rephraser import build_rephrase_prompt
+from gqc_agent.core._system_prompts.loader import load_system_prompt
+from gqc_agent.core._metrics.metrics import metrics
+from gqc_agent.core._resilience.admission import OverloadedError
+from gqc_agent.core._constants.constants import CURRENT, HISTORY, QUERY, ROLE, TIMESTAMP, USER, CLASSIFIER_PROMPT, QUERY_REPHRASOR_PROMPT
+
+# Agents run speculatively (their input is only the user's queries), with their prompts for token estimates
+SPECULATIVE_AGENTS = {
+    "intent_classifier": (CLASSIFIER_PROMPT, build_intent_prompt),
+    "query_rephraser": (QUERY_REPHRASOR_PROMPT, build_rephrase_prompt)
+}
+
+# Rough size of a token, used to estimate the tokens spent on discarded speculations
+CHARS_PER_TOKEN = 4
+
+
+def normalize_text(text: str) -> str:
+    """Collapse and trim whitespace, for comparing partial and final input. Case and punctuation are kept."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of `text` (about four characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class Speculation:
+    """
+    One speculative run of the intent classifier and query rephraser on partial input.
+
+    Attributes:
+        text (str): Partial input the speculation was started for.
+        history (list): User history queries the speculation was built with.
+        future (Future): Resolves to {agent name: result} when the run finishes.
+        superseded (bool): Newer input arrived; the result will not be used.
+    """
+    def __init__(self, text: str, history: list):
+        self.text = text
+        self.history = history
+        self.future = Future()
+        self.superseded = False
+        self.timer = None
+
+
+class SpeculativePrefetcher:
+    """
+    Run the query-only agents on text the user is still typing, and reuse the result on submit.
+
+    Each `prefetch` call restarts a debounce timer for its conversation. Once the
+    input has been stable for `debounce_ms`, `classify_intent` and `rephrase_query`
+    run in the background. Newer input cancels a speculation that has not started
+    yet. A speculation that has already started cannot be interrupted, because the
+    provider call is blocking; it is marked superseded and its tokens are counted
+    as wasted. Speculation is optional work: it runs only if admission control has
+    a free slot, and holds that slot while it runs, and an open circuit breaker makes
+    it fail rather than produce a degraded result. On submit, `take` returns the
+    speculation if its text matches the final text and the history has not changed
+    since. It counts as a hit only if it produced a usable result.
+
+    Attributes:
+        pipeline (AgentPipeline): Pipeline whose agents are run.
+        debounce_ms (float): Input must be stable this long before a speculation starts.
+        min_similarity (float): Lowest similarity ratio (0-1) between the speculated and the
+                                final text at which the speculation is reused. The default
+                                1.0 means equal apart from whitespace.
+        max_conversations (int): Pending speculations kept before the oldest is dropped.
+    """
+    def __init__(self, pipeline, debounce_ms: float = 300.0, min_similarity: float = 1.0, max_conversations: int = 10000):
+        if debounce_ms < 0 or not 0 < min_similarity <= 1 or max_conversations < 1:
+            raise ValueError("`debounce_ms` cannot be negative, `min_similarity` must be in (0, 1] "
+                             "and `max_conversations` must be at least 1")
+        self.pipeline = pipeline
+        self.debounce_ms = debounce_ms
+        self.min_similarity = min_similarity
+        self.max_conversations = max_conversations
+        self.prefetches = 0
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted_tokens = 0
+        self._lock = threading.RLock()
+        self._speculations = collections.OrderedDict()
+
+    def _user_history(self, conversation_id: str) -> list:
+        return [h for h in self.pipeline.history_store.get(conversation_id) if h.get(ROLE) == USER]
+
+    def prefetch(self, conversation_id: str, partial_text: str):
+        """
+        Schedule a speculative run on the user's partial input. Returns immediately.
+
+        Args:
+            conversation_id (str): Conversation key in the pipeline's history store.
+            partial_text (str): Text typed so far.
+        """
+        if not isinstance(partial_text, str) or not partial_text.strip():
+            return
+        history = self._user_history(conversation_id)
+        with self._lock:
+            self.prefetches += 1
+            metrics.inc("gqc_speculative_prefetches_total")
+            previous = self._speculations.get(conversation_id)
+            if previous is not None and not previous.superseded and previous.history == history \
+                    and normalize_text(previous.text) == normalize_text(partial_text):
+                return  # nothing new to speculate on
+            if previous is not None:
+                self._discard(previous, "superseded")
+
+            speculation = Speculation(partial_text, history)
+            speculation.timer = threading.Timer(self.debounce_ms / 1000, self._start, args=(conversation_id, speculation))
+            speculation.timer.daemon = True
+            self._speculations[conversation_id] = speculation
+            self._speculations.move_to_end(conversation_id)
+            if len(self._speculations) > self.max_conversations:
+                _, oldest = self._speculations.popitem(last=False)
+                self._discard(oldest, "evicted")
+        speculation.timer.start()
+
+    def _discard(self, speculation: Speculation, reason: str):
+        """Drop a speculation whose result will not be used. Called with the lock held."""
+        speculation.superseded = True
+        speculation.timer.cancel()
+        metrics.inc("gqc_speculative_discarded_total", reason=reason)
+        if speculation.future.cancel():
+            return  # never started: nothing was spent
+        speculation.future.add_done_callback(lambda _: self._count_waste(speculation))
+
+    def _count_waste(self, speculation: Speculation):
+        try:
+            tokens = self._estimate_tokens(speculation)
+        except Exception as e:
+            print(f"Error estimating speculative tokens: {e}")
+            return
+        with self._lock:
+            self.wasted_tokens += tokens
+        metrics.inc("gqc_speculative_wasted_tokens_total", tokens)
+
+    @staticmethod
+    def _estimate_tokens(speculation: Speculation) -> int:
+        """Estimate the prompt and completion tokens a finished speculation spent."""
+        agent_input = {CURRENT: {QUERY: speculation.text}, HISTORY: speculation.history}
+        tokens = 0
+        for name, result in speculation.future.result().items():
+            prompt_file, build_prompt = SPECULATIVE_AGENTS[name]
+            tokens += estimate_tokens(load_system_prompt(prompt_file) + build_prompt(agent_input) + json.dumps(result))
+        return tokens
+
+    def _start(self, conversation_id: str, speculation: Speculation):
+        """Timer callback: run the speculative agents unless the input changed meanwhile."""
+        if not speculation.future.set_running_or_notify_cancel():
+            return
+        try:
+            with self._admit():
+                results = self._run(speculation)
+        except OverloadedError:
+            metrics.inc("gqc_speculative_skipped_total", reason="overloaded")
+            results = {}
+        speculation.future.set_result(results)
+
+    def _admit(self):
+        admission = self.pipeline.admission
+        return admission.admit(queue=False) if admission is not None else contextlib.nullcontext()
+
+    def _run(self, speculation: Speculation) -> dict:
+        with self._lock:
+            self.started += 1
+        metrics.inc("gqc_speculative_runs_total")
+
+        agent_input = {
+            CURRENT: {ROLE: USER, QUERY: speculation.text, TIMESTAMP: datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+            HISTORY: speculation.history
+        }
+        results = {}
+
+        def run_rephrase():
+            results["query_rephraser"] = self.pipeline._run_rephrase(agent_input, speculative=True)
+
+        try:
+            self.pipeline._validate_model()
+            rephrase = threading.Thread(target=run_rephrase)
+            rephrase.start()
+            results["intent_classifier"] = self.pipeline._run_intent(agent_input, speculative=True)
+            rephrase.join()
+        except Exception as e:
+            print(f"Speculative run failed: {e}")
+        return results
+
+    def _matches(self, speculation: Speculation, final_text: str, history: list) -> bool:
+        if speculation.superseded or speculation.future.cancelled() or speculation.history != history:
+            return False
+        speculated, final = normalize_text(speculation.text), normalize_text(final_text)
+        if speculated == final:
+            return True
+        return self.min_similarity < 1 and difflib.SequenceMatcher(None, speculated, final).ratio() >= self.min_similarity
+
+    def take(self, conversation_id: str, final_text: str):
+        """
+        Claim the conversation's speculation for the submitted text.
+
+        Args:
+            conversation_id (str): Conversation key.
+            final_text (str): Submitted query.
+
+        Returns:
+            Speculation: Speculation to reuse (its future may still be running), or None on a miss.
+                         A running speculation is counted as a hit or a miss once it finishes.
+        """
+        history = self._user_history(conversation_id)
+        with self._lock:
+            speculation = self._speculations.pop(conversation_id, None)
+            if speculation is None:
+                metrics.inc("gqc_speculative_submits_total", outcome="none")
+                return None
+            started = speculation.future.running() or speculation.future.done()
+            if not started or not self._matches(speculation, final_text, history):
+                outcome = "mismatch" if started else "not_started"
+                self.misses += 1
+                metrics.inc("gqc_speculative_submits_total", outcome=outcome)
+                self._discard(speculation, outcome)
+                return None
+            if speculation.future.done() and not self.usable_results(speculation.future.result()):
+                self._count_submit(False)
+                return None
+        speculation.future.add_done_callback(lambda future: self._count_submit(bool(self.usable_results(future.result()))))
+        return speculation
+
+    def _count_submit(self, hit: bool):
+        """Count a matched speculation as a hit, or as a miss if it produced nothing usable."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("gqc_speculative_submits_total", outcome="hit" if hit else "empty")
+
+    @staticmethod
+    def usable_results(results: dict) -> dict:
+        """
+        Keep the speculative agent results that can stand in for a real run.
+
+        Args:
+            results (dict): Finished speculation result, {agent name: agent output}.
+
+        Returns:
+            dict: Agent name -> output, without failed agents.
+        """
+        return {name: result for name, result in results.items() if result and None not in result.values()}
+
+    def stats(self) -> dict:
+        """
+        Return speculation counters.
+
+        Returns:
+            dict: {"prefetches", "started", "hits", "misses", "hit_rate", "wasted_tokens"}.
+                  `hit_rate` is hits over submits that had a speculation; `wasted_tokens`
+                  is an estimate (about four characters per token).
+        """
+        with self._lock:
+            submits = self.hits + self.misses
+            return {
+                "prefetches": self.prefetches,
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / submits if submits else 0.0,
+                "wasted_tokens": self.wasted_tokens
+            }
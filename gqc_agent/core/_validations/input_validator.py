@@ -35,8 +35,27 @@ def validate_input(user_input: dict):
     # -----------------------------
     # Step 3: Validate 'current' section
     # -----------------------------
-    current = user_input[CURRENT]
+    validate_current(user_input[CURRENT])
+
+    # -----------------------------
+    # Step 4: Validate 'history' section
+    # -----------------------------
+    history = user_input[HISTORY]
     
+    if not isinstance(history, list):
+        raise ValueError("`history` must be a list")
+    
+    for idx, msg in enumerate(history):
+        validate_history_item(msg, idx)
+
+
+def validate_current(current: dict):
+    """
+    Validate the 'current' turn: {"role": "user", "query": str, "timestamp": str}.
+
+    Raises:
+        ValueError: if any required field is missing or incorrectly formatted.
+    """
     if not isinstance(current, dict):
         raise ValueError("`current` must be a dict")
     
@@ -51,34 +70,38 @@ def validate_input(user_input: dict):
     if current[ROLE] != USER:
         raise ValueError("`current.role` must be 'user'")
 
-    # -----------------------------
-    # Step 4: Validate 'history' section
-    # -----------------------------
-    history = user_input[HISTORY]
+
+def validate_history_item(msg: dict, idx: int = 0):
+    """
+    Validate a single history message:
+    {"role": "user"/"assistant", "query"/"response": str, "timestamp": str}.
+
+    Args:
+        msg (dict): History message.
+        idx (int): Position of the message, used in error messages.
+
+    Raises:
+        ValueError: if any required field is missing or incorrectly formatted.
+    """
+    # Each history item must be a dictionary
+    if not isinstance(msg, dict):
+        raise ValueError(f"History item {idx} must be a dict")
     
-    if not isinstance(history, list):
-        raise ValueError("`history` must be a list")
+    # Each item must have 'role' and 'timestamp'
+    if ROLE not in msg or TIMESTAMP not in msg:
+        raise ValueError(f"History item {idx} missing 'role' or 'timestamp'")
     
-    for idx, msg in enumerate(history):
-        # Each history item must be a dictionary
-        if not isinstance(msg, dict):
-            raise ValueError(f"History item {idx} must be a dict")
-        
-        # Each item must have 'role' and 'timestamp'
-        if ROLE not in msg or TIMESTAMP not in msg:
-            raise ValueError(f"History item {idx} missing 'role' or 'timestamp'")
-        
-        # Role must be either 'user' or 'assistant'
-        if msg[ROLE] not in [USER, ASSISTANT]:
-            raise ValueError(f"Invalid role in history item {idx}")
-        
-        # User messages must have 'query'
-        if msg[ROLE] == USER and QUERY not in msg:
-            raise ValueError(f"User history item {idx} missing 'query'")
-        
-        # Assistant messages must have 'response'
-        if msg[ROLE] == ASSISTANT and RESPONSE not in msg:
-            raise ValueError(f"Assistant history item {idx} missing 'response'")
+    # Role must be either 'user' or 'assistant'
+    if msg[ROLE] not in [USER, ASSISTANT]:
+        raise ValueError(f"Invalid role in history item {idx}")
+    
+    # User messages must have 'query'
+    if msg[ROLE] == USER and QUERY not in msg:
+        raise ValueError(f"User history item {idx} missing 'query'")
+    
+    # Assistant messages must have 'response'
+    if msg[ROLE] == ASSISTANT and RESPONSE not in msg:
+        raise ValueError(f"Assistant history item {idx} missing 'response'")
 
 
 # -----------------------------
@@ -1,8 +1,9 @@
 from difflib import get_close_matches
 from gqc_agent.core._llm_models.gpt_models import list_gpt_models
 from gqc_agent.core._llm_models.gemini_models import list_gemini_models
+from gqc_agent.core._llm_models.stub_models import list_stub_models
 
-def validate_model(model: str, client, provider: str = "gpt"):
+def validate_model(model: str, client, provider: str = "gpt", supported_models: list = None):
     """
     Validate that a given model is supported by the provider corresponding to the API key.
 
@@ -12,7 +13,9 @@ def validate_model(model: str, client, provider: str = "gpt"):
     Args:
         model (str): The model name to validate.
         client: Initialized GPT or Gemini client.
-        provider (str): LLM provider, either 'gpt' or 'gemini'. Default is 'gpt'.
+        provider (str): LLM provider, one of 'gpt', 'gemini' or 'stub'. Default is 'gpt'.
+        supported_models (list, optional): Previously fetched model catalog. When given,
+                                           the provider is not queried again.
 
     Raises:
         ValueError: If the model is invalid or no valid API key is provided.
@@ -20,7 +23,7 @@ def validate_model(model: str, client, provider: str = "gpt"):
     try:
         if provider.lower() == "gpt":
             # User selected GPT
-            gpt_models = list_gpt_models(client)
+            gpt_models = supported_models if supported_models is not None else list_gpt_models(client)
             if model not in gpt_models:
                 suggestion = get_close_matches(model, gpt_models, n=3, cutoff=0.4)
                 suggestion_msg = f" Did you mean: {suggestion}?" if suggestion else ""
@@ -29,13 +32,22 @@ def validate_model(model: str, client, provider: str = "gpt"):
 
         elif provider.lower() == "gemini":
             # User selected Gemini
-            gemini_models = list_gemini_models(client)
+            gemini_models = supported_models if supported_models is not None else list_gemini_models(client)
             if model not in gemini_models:
                 suggestion = get_close_matches(model, gemini_models, n=3, cutoff=0.4)
                 suggestion_msg = f" Did you mean: {suggestion}?" if suggestion else ""
                 raise ValueError(f"Invalid Gemini model '{model}'. Supported models: {gemini_models}{suggestion_msg}")
             print(f"Model '{model}' is valid for Gemini client")
 
+        elif provider.lower() == "stub":
+            # Local stand-in provider
+            stub_models = supported_models if supported_models is not None else list_stub_models(client)
+            if model not in stub_models:
+                suggestion = get_close_matches(model, stub_models, n=3, cutoff=0.4)
+                suggestion_msg = f" Did you mean: {suggestion}?" if suggestion else ""
+                raise ValueError(f"Invalid stub model '{model}'. Supported models: {stub_models}{suggestion_msg}")
+            print(f"Model '{model}' is valid for stub client")
+
         else:
             raise ValueError("No valid API key provided or unknown model provider")
     except ValueError:
@@ -1,16 +1,87 @@
 import json
+import time
+import contextlib
+import random
+import asyncio
 import threading
 from google import genai
 from openai import OpenAI
 from gqc_agent.core._llm_models.gpt_models import list_gpt_models
 from gqc_agent.core._llm_models.gemini_models import list_gemini_models
+from gqc_agent.core._llm_models.stub_models import list_stub_models
+from gqc_agent.core._llm_models.stub_client import StubClient
+from gqc_agent.core._llm_models.single_flight import SingleFlight
+from gqc_agent.core._llm_models.micro_batcher import MicroBatcher
+from gqc_agent.core._llm_models.llm_router import _call_key
+from gqc_agent.core._resilience.admission import AdmissionController, OverloadedError
+from gqc_agent.core._resilience.circuit_breaker import CircuitBreaker, CIRCUIT_BREAKER_KEYS
+from gqc_agent.core._history.history_store import InMemoryHistoryStore
+from gqc_agent.core._history.session import Session
+from gqc_agent.core._speculation.prefetcher import SpeculativePrefetcher, SPECULATIVE_AGENTS
 from gqc_agent.core._validations.input_validator import validate_input
 from gqc_agent.core._validations.model_validator import validate_model
-from gqc_agent.core._intent_classifier.classifier import classify_intent
-from gqc_agent.core._query_rephraser.rephraser import rephrase_query
-from gqc_agent.core._note_creator.note_creator import create_note
+from gqc_agent.core._intent_classifier.classifier import classify_intent, build_intent_prompt
+from gqc_agent.core._intent_classifier.local_model import LocalIntentModel
+from gqc_agent.core._intent_classifier.decision_log import IntentDecisionLog
+from gqc_agent.core._metrics.metrics import metrics
+from gqc_agent.core._query_rephraser.rephraser import rephrase_query, build_rephrase_prompt
+from gqc_agent.core._note_creator.note_creator import create_note, build_note_prompt
 from gqc_agent.core._system_prompts.loader import load_system_prompt
-from gqc_agent.core._constants.constants import CURRENT, HISTORY, ROLE, USER, QUERY
+from gqc_agent.core._constants.constants import CURRENT, HISTORY, ROLE, USER, QUERY, CLASSIFIER_PROMPT, QUERY_REPHRASOR_PROMPT, NOTES_CREATOR_PROMPT
+
+# Weight of the newest LLM intent latency in the running estimate of latency saved locally
+LATENCY_EWMA_ALPHA = 0.1
+
+# Agent name -> key of its output in the combined response
+AGENT_OUTPUT_KEYS = {
+    "intent_classifier": "intent",
+    "query_rephraser": "rephrased_queries",
+    "note_creator": "notes"
+}
+
+PROVIDERS = ("gpt", "gemini", "stub")
+
+# Options accepted for each agent in `agent_configs`
+AGENT_CONFIG_KEYS = ("provider", "model", "api_key", "client", "temperature", "max_output_tokens")
+GENERATION_CONFIG_KEYS = ("temperature", "max_output_tokens")
+
+# System prompt file and user prompt builder of every agent, to look up cached results
+AGENT_PROMPTS = {
+    "intent_classifier": (CLASSIFIER_PROMPT, build_intent_prompt),
+    "query_rephraser": (QUERY_REPHRASOR_PROMPT, build_rephrase_prompt),
+    "note_creator": (NOTES_CREATOR_PROMPT, build_note_prompt)
+}
+
+# Agents with short answers whose concurrent calls can share one multi-item request
+MICRO_BATCH_AGENTS = ("intent_classifier", "query_rephraser")
+
+
+def _create_client(provider: str, api_key: str):
+    """
+    Create the provider's client object.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    if provider == "gpt":
+        return OpenAI(api_key=api_key)
+    elif provider == "gemini":
+        return genai.Client(api_key=api_key)
+    elif provider == "stub":
+        return StubClient()
+    else:
+        raise ValueError("Provider must be either 'gpt', 'gemini' or 'stub'")
+
+
+def _list_models(provider: str, client) -> list:
+    if provider.lower() == "gpt":
+        return list_gpt_models(client)
+    elif provider.lower() == "gemini":
+        return list_gemini_models(client)
+    elif provider.lower() == "stub":
+        return list_stub_models(client)
+    else:
+        raise ValueError("Provider must be either 'gpt', 'gemini' or 'stub'")
 
 
 class AgentPipeline:
@@ -22,26 +93,193 @@ class AgentPipeline:
         api_key (str): API key for the selected LLM provider.
         model (str): Name of the model to use.
     """
-    def __init__(self, api_key: str, model: str, provider: str):
+    def __init__(self, api_key: str, model: str, provider: str, client=None, coalesce_calls: bool = True, result_cache=None, history_store=None, agent_configs: dict = None,
+                 local_intent_model=None, local_intent_threshold: float = 0.9, local_intent_shadow_rate: float = 0.0, intent_log=None,
+                 micro_batch_agents=None, micro_batch_size: int = 8, micro_batch_wait_ms: float = 10.0,
+                 max_in_flight: int = None, max_queue: int = 100, max_queue_wait_ms: float = 1000.0,
+                 circuit_breaker: dict = None, degraded_response: dict = None,
+                 prefetch_debounce_ms: float = 300.0, prefetch_min_similarity: float = 1.0):
         """
         Initialize the AgentPipeline with LLM provider, model, and API key.
 
         Args:
-            api_key (str): OpenAI or Gemini API key.
+            api_key (str): OpenAI or Gemini API key. Ignored for the "stub" provider.
             model (str): Model name to be used with the API key.
-            provider (str): LLM provider, must be either "gpt" or "gemini".
+            provider (str): LLM provider, must be "gpt", "gemini" or "stub"
+                            (local stand-in provider for tests and local runs).
+            client (optional): Pre-built provider client. When given, it is used instead
+                               of creating one from `api_key`.
+            coalesce_calls (bool): Share one provider call between identical concurrent
+                                   agent calls (same model, system prompt and user prompt).
+                                   Default is True.
+            result_cache (MutableMapping, optional): Keep coalesced results after completion,
+                                   e.g. `cachetools.TTLCache(maxsize=1024, ttl=60)`.
+                                   Requires `coalesce_calls`. Default is no caching.
+            history_store (HistoryStore, optional): Server-side history used by `session()`.
+                                   Default is an `InMemoryHistoryStore`.
+            agent_configs (dict, optional): Per-agent overrides keyed by "intent_classifier",
+                                   "query_rephraser" or "note_creator". Each value may set
+                                   "provider", "model", "api_key" (or a pre-built "client"),
+                                   "temperature" and "max_output_tokens". Agents without an
+                                   override use the pipeline's provider and model. When given,
+                                   every agent's model is validated against the cached
+                                   catalog right away.
+            local_intent_model (LocalIntentModel | str, optional): Local intent classifier, or the
+                                   path of its saved artifact. Predictions with a confidence of at
+                                   least `local_intent_threshold` skip the provider; the others fall
+                                   back to the LLM. Requires numpy.
+            local_intent_threshold (float): Confidence needed to serve a local prediction. Default is 0.9.
+            local_intent_shadow_rate (float): Share of confident local predictions that are still
+                                   sent to the LLM to measure agreement. Default is 0.
+            intent_log (IntentDecisionLog | str, optional): Log (or log file path) receiving every
+                                   LLM intent decision, to train the local classifier.
+            micro_batch_agents (list, optional): Agents ("intent_classifier", "query_rephraser")
+                                   whose concurrent calls are merged into multi-item provider
+                                   requests. Default is no micro-batching.
+            micro_batch_size (int): Items per micro-batched request. Default is 8.
+            micro_batch_wait_ms (float): Longest time a call waits for others to join its batch.
+                                   Default is 10 ms.
+            max_in_flight (int, optional): Pipeline runs executing at once. Further runs wait in a
+                                   queue and are rejected with {"error": "Service overloaded, retry
+                                   later"} when it is full or the wait is too long. Default is unbounded.
+            max_queue (int): Runs allowed to wait for a slot. Default is 100.
+            max_queue_wait_ms (float): Longest time a run waits for a slot. Default is 1000 ms.
+            circuit_breaker (dict, optional): Enables one circuit breaker per provider/model, with
+                                   optional settings "failure_rate", "slow_call_ms", "window",
+                                   "min_calls", "open_seconds" and "half_open_probes"
+                                   (see `CircuitBreaker`). Pass {} for the defaults.
+            degraded_response (dict, optional): Output returned by an agent while its breaker is
+                                   open, e.g. {"intent": "ambiguous"}. A cached result of the same
+                                   call (see `result_cache`) or, for intent, the local model's
+                                   prediction is preferred. Missing keys are None.
+            prefetch_debounce_ms (float): Partial input passed to `prefetch` must be stable this
+                                   long before it is processed speculatively. Default is 300 ms.
+            prefetch_min_similarity (float): Lowest similarity (0-1) between the speculated and the
+                                   submitted text at which the speculative result is reused.
+                                   Default is 1.0, i.e. equal text apart from whitespace.
+                                   Lower values reuse results computed for
+                                   slightly different text and should be chosen with care.
+
+        Raises:
+            ValueError: If the provider, an agent override or an agent model is invalid.
         """
         
         self.model = model
         self.provider = provider
+
+        # Model catalogs (one per client) are fetched once and reused by every run
+        self._model_catalogs = {}
+        self._model_validated = False
+        self._catalog_lock = threading.Lock()
+
+        # In-flight deduplication of identical agent calls
+        if result_cache is not None and not coalesce_calls:
+            raise ValueError("`result_cache` requires `coalesce_calls=True`")
+        self.single_flight = SingleFlight(cache=result_cache) if coalesce_calls else None
+
+        # Server-side conversation history for session()
+        self.history_store = history_store if history_store is not None else InMemoryHistoryStore()
         
         # Initialize client once
-        if self.provider == "gpt":
-            self.client = OpenAI(api_key=api_key)
-        elif self.provider == "gemini":
-            self.client = genai.Client(api_key=api_key)
-        else:
-            raise ValueError("Provider must be either 'gpt' or 'gemini'")
+        if self.provider not in PROVIDERS:
+            raise ValueError("Provider must be either 'gpt', 'gemini' or 'stub'")
+        self.client = client if client is not None else _create_client(self.provider, api_key)
+
+        # Provider, model, client and generation settings of every agent
+        self.agent_configs = self._resolve_agent_configs(agent_configs or {}, api_key)
+        if agent_configs:
+            self._validate_model()
+
+        # Local intent classifier and the log it is trained from
+        if isinstance(local_intent_model, str):
+            local_intent_model = LocalIntentModel.load(local_intent_model)
+        self.local_intent_model = local_intent_model
+        self.local_intent_threshold = local_intent_threshold
+        self.local_intent_shadow_rate = local_intent_shadow_rate
+        self.intent_log = IntentDecisionLog(intent_log) if isinstance(intent_log, str) else intent_log
+        self._intent_llm_latency = local_intent_model.mean_llm_latency if local_intent_model else 0.0
+
+        # Cross-request micro-batching of the short-answer agents
+        unknown_agents = set(micro_batch_agents or ()) - set(MICRO_BATCH_AGENTS)
+        if unknown_agents:
+            raise ValueError(f"Micro-batching is not supported for {sorted(unknown_agents)}. Expected: {list(MICRO_BATCH_AGENTS)}")
+        self.micro_batchers = {
+            name: MicroBatcher(name, AGENT_OUTPUT_KEYS[name], self.agent_configs[name]["client"],
+                               self.agent_configs[name]["model"], self.agent_configs[name]["provider"],
+                               max_batch_size=micro_batch_size, max_wait_ms=micro_batch_wait_ms,
+                               generation_config=self.agent_configs[name]["generation_config"],
+                               single_flight=self.single_flight)
+            for name in (micro_batch_agents or ())
+        }
+
+        # Load shedding: bounded concurrent runs and per provider/model circuit breakers
+        self.admission = AdmissionController(max_in_flight, max_queue, max_queue_wait_ms) if max_in_flight else None
+        unknown_options = set(circuit_breaker or {}) - set(CIRCUIT_BREAKER_KEYS)
+        if unknown_options:
+            raise ValueError(f"Unknown circuit_breaker option(s): {sorted(unknown_options)}. Expected: {list(CIRCUIT_BREAKER_KEYS)}")
+        self.circuit_breakers = {}
+        if circuit_breaker is not None:
+            for config in self.agent_configs.values():
+                key = (config["provider"], config["model"])
+                if key not in self.circuit_breakers:
+                    self.circuit_breakers[key] = CircuitBreaker(config["provider"], config["model"], **circuit_breaker)
+        unknown_keys = set(degraded_response or {}) - set(AGENT_OUTPUT_KEYS.values())
+        if unknown_keys:
+            raise ValueError(f"Unknown degraded_response key(s): {sorted(unknown_keys)}. Expected: {list(AGENT_OUTPUT_KEYS.values())}")
+        self.degraded_response = {output_key: None for output_key in AGENT_OUTPUT_KEYS.values()}
+        self.degraded_response.update(degraded_response or {})
+
+        # Speculative processing of partial input for sessions
+        self.prefetcher = SpeculativePrefetcher(self, debounce_ms=prefetch_debounce_ms, min_similarity=prefetch_min_similarity)
+
+    def _resolve_agent_configs(self, overrides: dict, api_key: str) -> dict:
+        """
+        Merge per-agent overrides with the pipeline defaults.
+
+        Agents sharing a provider and API key share one client.
+
+        Returns:
+            dict: Agent name -> {"provider", "model", "client", "generation_config"}.
+
+        Raises:
+            ValueError: If an agent name, option or provider is invalid, or a required model
+                        or API key is missing.
+        """
+        unknown_agents = set(overrides) - set(AGENT_OUTPUT_KEYS)
+        if unknown_agents:
+            raise ValueError(f"Unknown agent(s) in agent_configs: {sorted(unknown_agents)}. Expected: {list(AGENT_OUTPUT_KEYS)}")
+
+        clients = {(self.provider, api_key): self.client}
+        resolved = {}
+        for name in AGENT_OUTPUT_KEYS:
+            config = overrides.get(name) or {}
+            unknown_options = set(config) - set(AGENT_CONFIG_KEYS)
+            if unknown_options:
+                raise ValueError(f"Unknown option(s) for {name}: {sorted(unknown_options)}. Expected: {list(AGENT_CONFIG_KEYS)}")
+
+            provider = config.get("provider", self.provider)
+            if provider not in PROVIDERS:
+                raise ValueError(f"Provider for {name} must be either 'gpt', 'gemini' or 'stub'")
+            model = config.get("model", self.model if provider == self.provider else None)
+            if not model:
+                raise ValueError(f"`model` is required for {name} when its provider differs from the pipeline's")
+
+            agent_client = config.get("client")
+            if agent_client is None:
+                agent_api_key = config.get("api_key", api_key if provider == self.provider else None)
+                if agent_api_key is None and provider != "stub":
+                    raise ValueError(f"`api_key` is required for {name} with provider '{provider}'")
+                if (provider, agent_api_key) not in clients:
+                    clients[(provider, agent_api_key)] = _create_client(provider, agent_api_key)
+                agent_client = clients[(provider, agent_api_key)]
+
+            resolved[name] = {
+                "provider": provider,
+                "model": model,
+                "client": agent_client,
+                "generation_config": {key: config[key] for key in GENERATION_CONFIG_KEYS if key in config}
+            }
+        return resolved
 
 
     def get_supported_models(self):
@@ -56,16 +294,96 @@ class AgentPipeline:
             list: Supported model names. Returns empty list if error occurs.
         """
         try:
-            if self.provider.lower() == "gpt":
-                return list_gpt_models(self.client)
-            elif self.provider.lower() == "gemini":
-                return list_gemini_models(self.client)
-            else:
-                raise ValueError("Provider must be either 'gpt' or 'gemini'")
+            return _list_models(self.provider, self.client)
         except Exception as e:
             print(f"Error fetching supported models: {e}")
             return []
+
+    def warm_model_catalog(self):
+        """
+        Fetch the model catalog of every client used by the pipeline once and cache it.
+
+        Later runs validate the configured models against these cached catalogs
+        instead of listing the provider's models on every request.
+
+        Returns:
+            list: Cached model names of the pipeline's default provider. Empty list if the
+                  catalog could not be fetched, in which case the next call tries again.
+        """
+        with self._catalog_lock:
+            targets = [(self.provider, self.client)] + [(c["provider"], c["client"]) for c in self.agent_configs.values()]
+            attempted = set()
+            for provider, client in targets:
+                if not self._model_catalogs.get(id(client)) and id(client) not in attempted:
+                    attempted.add(id(client))
+                    try:
+                        self._model_catalogs[id(client)] = _list_models(provider, client) or None
+                    except Exception as e:
+                        print(f"Error fetching supported models: {e}")
+            return list(self._model_catalogs.get(id(self.client)) or [])
+
+    def _catalog_for(self, client) -> list:
+        return list(self._model_catalogs.get(id(client)) or [])
+
+    def is_ready(self) -> bool:
+        """
+        Check whether the model catalogs are warmed and contain every agent's model.
+
+        Returns:
+            bool: True if the pipeline can serve requests without a catalog round-trip.
+        """
+        return all(config["model"] in self._catalog_for(config["client"]) for config in self.agent_configs.values())
+
+    def _validate_model(self):
+        """
+        Validate every agent's model against the cached catalogs, once per pipeline.
+
+        Raises:
+            ValueError: If a model is not in its provider's catalog.
+        """
+        if self._model_validated:
+            return
+        self.warm_model_catalog()
+        checked = set()
+        for config in self.agent_configs.values():
+            key = (id(config["client"]), config["model"])
+            if key in checked:
+                continue
+            validate_model(config["model"], config["client"], config["provider"], supported_models=self._catalog_for(config["client"]))
+            checked.add(key)
+        self._model_validated = True
         
+    def session(self, conversation_id: str) -> Session:
+        """
+        Return a handle on a conversation whose history is kept server-side.
+
+        Clients then send only the new turn with `session.run(current)` and record the
+        assistant's answer with `session.add_response(text)`.
+
+        Args:
+            conversation_id (str): Conversation key in the history store.
+
+        Returns:
+            Session: Session bound to this pipeline.
+        """
+        return Session(self, conversation_id)
+
+    def prefetch(self, conversation_id: str, partial_text: str):
+        """
+        Speculatively classify and rephrase what the user is still typing.
+
+        Call it on every keystroke (or input event); processing starts once the text has been
+        stable for `prefetch_debounce_ms`, and newer text cancels older, not yet started work.
+        When `session(conversation_id).run()` is then called with matching text, the speculative
+        intent and rephrased queries are reused and only the note creator still runs.
+        Returns immediately.
+
+        Args:
+            conversation_id (str): Conversation key in the history store.
+            partial_text (str): Text typed so far.
+        """
+        self.prefetcher.prefetch(conversation_id, partial_text)
+
     @classmethod
     def show_system_prompt(cls, filename="default_prompt.md"):
         """
@@ -88,13 +406,217 @@ class AgentPipeline:
             print(f"Error loading system prompt: {e}")
             return ""
 
+    def _prepare_agent_inputs(self, user_input: dict, validate_input_format: bool = True):
+        """
+        Validate the user input and the model, and build the input of every agent.
+
+        Args:
+            user_input (dict): Structured user input (see `run_gqc`).
+            validate_input_format (bool): Validate `user_input` with `validate_input`. Sessions
+                                          pass False because they validate each turn once on arrival.
+
+        Returns:
+            tuple: (agent_input, note_creator_input, error). `error` is the error response
+                   dict when validation failed, otherwise None.
+        """
+        # -----------------------------
+        # Step 1: Validate main input
+        # -----------------------------
+        if validate_input_format:
+            try:
+                validate_input(user_input)
+            except ValueError as ve:
+                print(f"Input validation failed: {ve}")
+                return None, None, {"error": "Invalid input format"}
+
+        # -----------------------------
+        # Step 2: Validate model
+        # -----------------------------
+        try:
+            self._validate_model()
+        except ValueError as ve:
+            print(f"Model validation failed: {ve}")
+            return None, None, {"error": "Invalid model selection"}
+        except Exception as e:
+            print(f"Unexpected error during model validation: {e}")
+            return None, None, {"error": "Internal error validating model"}
+
+        # -----------------------------
+        # Step 3: Prepare agent inputs
+        # -----------------------------
+        # Intent Classifier & Query Rephraser get only current + history
+        agent_input = {
+            CURRENT: user_input[CURRENT],
+            HISTORY: [h for h in user_input.get(HISTORY, []) if h[ROLE] == USER]
+        }
+
+        # Note Creator gets full input
+        note_creator_input = user_input
+
+        return agent_input, note_creator_input, None
+
+    def _run_intent(self, agent_input: dict, speculative: bool = False) -> dict:
+        # Speculative runs see partial input and may be discarded: they are neither logged nor measured
+        try:
+            local_intent = self._predict_local_intent(agent_input)
+            confident = local_intent is not None and local_intent[1] >= self.local_intent_threshold
+            if confident and random.random() >= self.local_intent_shadow_rate:
+                if not speculative:
+                    metrics.inc("gqc_local_intent_total", outcome="served")
+                    metrics.inc("gqc_local_intent_latency_saved_seconds_total", self._intent_llm_latency)
+                return {"intent": local_intent[0]}
+
+            config = self.agent_configs["intent_classifier"]
+            started = time.perf_counter()
+            result, degraded = self._call_agent("intent_classifier", agent_input, lambda: classify_intent(
+                agent_input, config["model"], config["provider"], config["client"],
+                single_flight=self.single_flight, generation_config=config["generation_config"],
+                micro_batcher=self.micro_batchers.get("intent_classifier")), speculative)
+            if not degraded and not speculative:
+                self._record_intent_decision(agent_input, result, time.perf_counter() - started, local_intent, confident)
+            return result
+        except Exception as e:
+            print(f"Intent classification error: {e}")
+            return {"intent": None}
+
+    def _call_agent(self, name: str, agent_payload: dict, call, speculative: bool = False) -> tuple:
+        """
+        Run one agent's provider call through the circuit breaker of its provider/model.
+
+        Args:
+            name (str): Agent name.
+            agent_payload (dict): Agent input, used to build the degraded result.
+            call (callable): Makes the provider call and returns the agent result.
+            speculative (bool): The call runs on partial input. While the breaker is open it
+                                gets a failed result instead of a degraded one, so it is not reused.
+
+        Returns:
+            tuple: (result, degraded). `degraded` is True when the breaker is open and the
+                   result is the degraded response instead of the provider's answer.
+        """
+        config = self.agent_configs[name]
+        breaker = self.circuit_breakers.get((config["provider"], config["model"]))
+        if breaker is None:
+            return call(), False
+        if not breaker.allow():
+            if speculative:
+                return {AGENT_OUTPUT_KEYS[name]: None}, True
+            return self._degraded_result(name, agent_payload), True
+
+        started = time.perf_counter()
+        success = False
+        try:
+            result = call()
+            success = isinstance(result, dict) and result.get(AGENT_OUTPUT_KEYS[name]) is not None
+            return result, False
+        finally:
+            breaker.record(success, time.perf_counter() - started)
+
+    def _degraded_result(self, name: str, agent_payload: dict) -> dict:
+        """
+        Build an agent's result without calling its provider.
+
+        Uses, in order: a cached result of the identical call, the local intent model
+        (intent classifier only), then the configured degraded response.
+        """
+        output_key = AGENT_OUTPUT_KEYS[name]
+        source, value = "configured", self.degraded_response[output_key]
+        try:
+            config = self.agent_configs[name]
+            prompt_file, build_prompt = AGENT_PROMPTS[name]
+            cached = None
+            if self.single_flight is not None:
+                key = _call_key(config["client"], config["model"], config["provider"], load_system_prompt(prompt_file),
+                                build_prompt(agent_payload), config["generation_config"])
+                cached = self.single_flight.peek(key)
+            if cached is not None:
+                source, value = "cache", json.loads(cached).get(output_key)
+            elif name == "intent_classifier" and self.local_intent_model is not None:
+                local_intent = self._predict_local_intent(agent_payload)
+                if local_intent is not None:
+                    source, value = "local_model", local_intent[0]
+        except Exception as e:
+            print(f"Error building degraded {output_key}: {e}")
+        metrics.inc("gqc_degraded_responses_total", agent=name, source=source)
+        return {output_key: value}
+
+    def _predict_local_intent(self, agent_input: dict):
+        """
+        Classify with the local model, if any.
+
+        Returns:
+            tuple: (intent, confidence), or None without a local model or if it failed.
+        """
+        if self.local_intent_model is None:
+            return None
+        try:
+            history = [h[QUERY] for h in agent_input.get(HISTORY, []) if h.get(ROLE) == USER]
+            return self.local_intent_model.predict(agent_input[CURRENT][QUERY], history)
+        except Exception as e:
+            print(f"Local intent classification error: {e}")
+            return None
+
+    def _record_intent_decision(self, agent_input: dict, result: dict, latency: float, local_intent, confident: bool):
+        """
+        Track the latency of an LLM intent call, its agreement with the local model,
+        and append it to the decision log.
+        """
+        intent = result.get("intent") if isinstance(result, dict) else None
+        self._intent_llm_latency += LATENCY_EWMA_ALPHA * (latency - self._intent_llm_latency) if self._intent_llm_latency else latency
+        metrics.observe("gqc_intent_llm_duration_seconds", latency)
+        if local_intent is not None:
+            confidence = "high" if confident else "low"
+            metrics.inc("gqc_local_intent_total", outcome="shadowed" if confident else "fallback")
+            metrics.inc("gqc_local_intent_compared_total", confidence=confidence)
+            if local_intent[0] == intent:
+                metrics.inc("gqc_local_intent_agreed_total", confidence=confidence)
+        if self.intent_log is not None and intent:
+            try:
+                self.intent_log.record(agent_input, intent, latency)
+            except Exception as e:
+                print(f"Error logging intent decision: {e}")
+
+    def _run_rephrase(self, agent_input: dict, speculative: bool = False) -> dict:
+        try:
+            config = self.agent_configs["query_rephraser"]
+            result, _ = self._call_agent("query_rephraser", agent_input, lambda: rephrase_query(
+                agent_input, config["model"], config["provider"], config["client"],
+                single_flight=self.single_flight, generation_config=config["generation_config"],
+                micro_batcher=self.micro_batchers.get("query_rephraser")), speculative)
+            return result
+        except Exception as e:
+            print(f"Query rephrasing error: {e}")
+            return {"rephrased_queries": None}
+
+    def _run_note(self, note_creator_input: dict) -> dict:
+        try:
+            config = self.agent_configs["note_creator"]
+            result, _ = self._call_agent("note_creator", note_creator_input, lambda: create_note(
+                note_creator_input, config["model"], config["provider"], config["client"],
+                single_flight=self.single_flight, generation_config=config["generation_config"]))
+            return result
+        except Exception as e:
+            print(f"Note creation error: {e}")
+            return {"notes": None}
+
+    @staticmethod
+    def _merge_results(results: dict) -> dict:
+        try:
+            return {
+                AGENT_OUTPUT_KEYS[name]: result.get(AGENT_OUTPUT_KEYS[name]) if result else None
+                for name, result in results.items()
+            }
+        except Exception as e:
+            print(f"Error merging results: {e}")
+            return {output_key: None for output_key in AGENT_OUTPUT_KEYS.values()}
+
     def run_gqc(self, user_input: dict):
         """
         Run all agents in parallel threads and return combined results.
 
         Steps:
             1. Validate main user input.
-            2. Validate model selection.
+            2. Validate model selection (against the cached model catalog).
             3. Prepare inputs for agents:
                 - Intent Classifier & Query Rephraser get only current + history of user messages.
                 - Note Creator gets full user input.
@@ -122,38 +644,40 @@ class AgentPipeline:
                 Each field is None if the corresponding agent failed.
         """
         # -----------------------------
-        # Step 1: Validate main input
+        # Step 1-3: Validate and prepare agent inputs
         # -----------------------------
-        try:
-            validate_input(user_input)
-        except ValueError as ve:
-            print(f"Input validation failed: {ve}")
-            return {"error": "Invalid input format"}
+        agent_input, note_creator_input, error = self._prepare_agent_inputs(user_input)
+        if error:
+            return error
 
-        # -----------------------------
-        # Step 2: Validate model
-        # -----------------------------
-        try:
-            validate_model(self.model, self.client, self.provider)
-        except ValueError as ve:
-            print(f"Model validation failed: {ve}")
-            return {"error": "Invalid model selection"}
-        except Exception as e:
-            print(f"Unexpected error during model validation: {e}")
-            return {"error": "Internal error validating model"}
+        return self._run_agents(agent_input, note_creator_input)
 
-        # -----------------------------
-        # Step 3: Prepare agent inputs
-        # -----------------------------
-        # Intent Classifier & Query Rephraser get only current + history
-        agent_input = {
-            CURRENT: user_input[CURRENT],
-            HISTORY: [h for h in user_input.get(HISTORY, []) if h[ROLE] == USER]
-        }
+    def _run_agents(self, agent_input: dict, note_creator_input: dict, speculation=None) -> dict:
+        """
+        Run the three agents on prepared inputs once admitted by admission control.
 
-        # Note Creator gets full input
-        note_creator_input = user_input
+        `speculation` is the future of a matching speculative run (see `prefetch`); its results
+        replace the intent classifier and query rephraser runs where available.
+        """
+        if self.admission is None:
+            return self._execute_agents(agent_input, note_creator_input, speculation)
+        try:
+            with self.admission.admit():
+                return self._execute_agents(agent_input, note_creator_input, speculation)
+        except OverloadedError as oe:
+            return {"error": str(oe)}
+
+    @staticmethod
+    def _speculative_result(speculation, name: str):
+        """Wait for a speculative run and return its usable result for agent `name`, if any."""
+        if speculation is None:
+            return None
+        return SpeculativePrefetcher.usable_results(speculation.result()).get(name)
 
+    def _execute_agents(self, agent_input: dict, note_creator_input: dict, speculation=None) -> dict:
+        """
+        Run the three agents in parallel threads on prepared inputs and merge their results.
+        """
         # -----------------------------
         # Step 4: Thread results storage
         # -----------------------------
@@ -167,25 +691,13 @@ class AgentPipeline:
         # Step 5: Define threads
         # -----------------------------
         def run_intent():
-            try:
-                results["intent_classifier"] = classify_intent(agent_input, self.model, self.provider, self.client)
-            except Exception as e:
-                print(f"Intent classification error: {e}")
-                results["intent_classifier"] = {"intent": None}
+            results["intent_classifier"] = self._speculative_result(speculation, "intent_classifier") or self._run_intent(agent_input)
             
         def run_rephrase():
-            try:
-                results["query_rephraser"] = rephrase_query(agent_input, self.model, self.provider, self.client) 
-            except Exception as e:
-                print(f"Query rephrasing error: {e}")
-                results["query_rephraser"] = {"rephrased_queries": None}
+            results["query_rephraser"] = self._speculative_result(speculation, "query_rephraser") or self._run_rephrase(agent_input)
                 
         def run_note():
-            try:
-                results["note_creator"] = create_note(note_creator_input, self.model, self.provider, self.client)
-            except Exception as e:
-                print(f"Note creation error: {e}")
-                results["note_creator"] = {"notes": None}
+            results["note_creator"] = self._run_note(note_creator_input)
 
         # -----------------------------
         # Step 6: Create threads objects
@@ -212,24 +724,114 @@ class AgentPipeline:
         # -----------------------------
         # Step 8: Merge results
         # -----------------------------
+        return self._merge_results(results)
+
+    async def astream_gqc(self, user_input: dict):
+        """
+        Async variant of `run_gqc` that yields each agent's output as soon as it is ready.
+
+        The blocking provider calls run in the event loop's default thread pool, so many
+        conversations can be processed concurrently from a single event loop.
+
+        Args:
+            user_input (dict): Structured user input (see `run_gqc`).
+
+        Yields:
+            tuple: (key, value) pairs, where key is "intent", "rephrased_queries" or "notes".
+                   If validation fails, a single ("error", message) pair is yielded.
+        """
+        agent_input, note_creator_input, error = await asyncio.to_thread(self._prepare_agent_inputs, user_input)
+        if error:
+            yield "error", error["error"]
+            return
+
+        async for key, value in self._astream_agents(agent_input, note_creator_input):
+            yield key, value
+
+    async def _astream_agents(self, agent_input: dict, note_creator_input: dict, speculation=None):
+        """
+        Stream the three agents' results once admitted by admission control.
+
+        `speculation` is the future of a matching speculative run (see `prefetch`).
+        """
+        admission = self.admission.aadmit() if self.admission is not None else contextlib.nullcontext()
         try:
-            final_output = {
-                "intent": results["intent_classifier"].get("intent") if results["intent_classifier"] else None,
-                "rephrased_queries": results["query_rephraser"].get("rephrased_queries") if results["query_rephraser"] else None,
-                "notes": results["note_creator"].get("notes") if results["note_creator"] else None
-            }
-        except Exception as e:
-            print(f"Error merging results: {e}")
-            final_output = {
-                "intent": None,
-                "rephrased_queries": None,
-                "notes": None
-            }
+            async with admission:
+                async for key, value in self._astream_admitted(agent_input, note_creator_input, speculation):
+                    yield key, value
+        except OverloadedError as oe:
+            yield "error", str(oe)
 
+    async def _astream_admitted(self, agent_input: dict, note_creator_input: dict, speculation=None):
+        """
+        Run the three agents concurrently on prepared inputs, yielding (key, value) as each finishes.
+        """
+        async def run_agent(name, func, agent_payload):
+            if speculation is not None and name in SPECULATIVE_AGENTS:
+                result = SpeculativePrefetcher.usable_results(await asyncio.wrap_future(speculation)).get(name)
+                if result is not None:
+                    return name, result
+            return name, await asyncio.to_thread(func, agent_payload)
+
+        tasks = [
+            asyncio.ensure_future(run_agent("intent_classifier", self._run_intent, agent_input)),
+            asyncio.ensure_future(run_agent("query_rephraser", self._run_rephrase, agent_input)),
+            asyncio.ensure_future(run_agent("note_creator", self._run_note, note_creator_input)),
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                name, result = await next_done
+                output_key = AGENT_OUTPUT_KEYS[name]
+                yield output_key, result.get(output_key) if result else None
+        finally:
+            # Consumer went away (e.g. client disconnected): drop the remaining agents
+            for task in tasks:
+                task.cancel()
+
+    async def arun_gqc(self, user_input: dict):
+        """
+        Async variant of `run_gqc`.
 
+        Args:
+            user_input (dict): Structured user input (see `run_gqc`).
+
+        Returns:
+            dict: Same combined output as `run_gqc`.
+        """
+        return await self._collect(self.astream_gqc(user_input))
+
+    @staticmethod
+    async def _collect(stream) -> dict:
+        """Gather a (key, value) stream into the combined `run_gqc` output."""
+        final_output = {output_key: None for output_key in AGENT_OUTPUT_KEYS.values()}
+        async for key, value in stream:
+            if key == "error":
+                return {"error": value}
+            final_output[key] = value
         return final_output
 
 
+def build_pipeline(pipeline_config: dict) -> AgentPipeline:
+    """
+    Create an AgentPipeline from a plain (picklable) config dict.
+
+    Used by the server and the batch runner to build one pipeline inside every
+    worker process.
+
+    Args:
+        pipeline_config (dict): `AgentPipeline` keyword arguments, plus the optional
+                                "stub_latency" (float) for the "stub" provider.
+
+    Returns:
+        AgentPipeline: New pipeline.
+    """
+    config = dict(pipeline_config)
+    stub_latency = config.pop("stub_latency", 0.0)
+    if config.get("provider") == "stub" and "client" not in config:
+        config["client"] = StubClient(latency=stub_latency)
+    return AgentPipeline(**config)
+
+
 # -----------------------
 # Quick CLI test
 # -----------------------
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+import pytest
+from gqc_agent.core.orchestrator import AgentPipeline
+from gqc_agent.core._resilience.admission import AdmissionController, OverloadedError, OVERLOADED_ERROR
+
+
+def test_rejects_when_queue_is_full():
+    admission = AdmissionController(max_in_flight=1, max_queue=0)
+    with admission.admit():
+        with pytest.raises(OverloadedError):
+            with admission.admit():
+                pass
+    assert admission.stats() == {"in_flight": 0, "queued": 0, "rejected": 1}
+
+
+def test_rejects_after_queue_wait():
+    admission = AdmissionController(max_in_flight=1, max_queue=1, max_queue_wait_ms=50)
+    with admission.admit():
+        started = time.perf_counter()
+        with pytest.raises(OverloadedError):
+            with admission.admit():
+                pass
+        assert time.perf_counter() - started >= 0.05
+    assert admission.stats() == {"in_flight": 0, "queued": 0, "rejected": 1}
+
+
+def test_slot_is_handed_to_oldest_waiter():
+    admission = AdmissionController(max_in_flight=1, max_queue=2, max_queue_wait_ms=5000)
+    order = []
+    holder = admission.admit()
+    holder.__enter__()
+
+    def wait(name):
+        with admission.admit():
+            order.append(name)
+            assert admission.stats()["in_flight"] == 1
+
+    waiters = []
+    for name in ("first", "second"):
+        waiter = threading.Thread(target=wait, args=(name,))
+        waiter.start()
+        waiters.append(waiter)
+        while admission.stats()["queued"] < len(waiters):
+            time.sleep(0.001)
+
+    holder.__exit__(None, None, None)
+    for waiter in waiters:
+        waiter.join(5)
+    assert order == ["first", "second"]
+    assert admission.stats() == {"in_flight": 0, "queued": 0, "rejected": 0}
+
+
+def test_without_queue_fails_fast_and_is_not_counted():
+    admission = AdmissionController(max_in_flight=1, max_queue=10)
+    with admission.admit():
+        with pytest.raises(OverloadedError):
+            with admission.admit(queue=False):
+                pass
+    assert admission.stats() == {"in_flight": 0, "queued": 0, "rejected": 0}
+
+
+def test_async_callers_share_slots_with_threads():
+    admission = AdmissionController(max_in_flight=1, max_queue=0)
+
+    async def admit():
+        async with admission.aadmit():
+            pass
+
+    with admission.admit():
+        with pytest.raises(OverloadedError):
+            asyncio.run(admit())
+    asyncio.run(admit())
+    assert admission.stats() == {"in_flight": 0, "queued": 0, "rejected": 1}
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    admission = AdmissionController(max_in_flight=1, max_queue=1, max_queue_wait_ms=5000)
+
+    async def main():
+        async def admit():
+            async with admission.aadmit():
+                pass
+
+        with admission.admit():
+            task = asyncio.ensure_future(admit())
+            while admission.stats()["queued"] == 0:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert admission.stats() == {"in_flight": 0, "queued": 0, "rejected": 0}
+
+    asyncio.run(main())
+
+
+def test_pipeline_returns_overloaded_error():
+    pipeline = AgentPipeline(api_key=None, model="stub-small", provider="stub", max_in_flight=1, max_queue=0)
+    session = pipeline.session("conversation")
+    with pipeline.admission.admit():
+        assert session.run("find the pending brokers") == {"error": OVERLOADED_ERROR}
+    # A rejected turn is not added to the history
+    assert session.history() == []
+    assert session.run("find the pending brokers")["intent"] == "search"
@@ -0,0 +1,161 @@
+import json
+import os
+import pytest
+from gqc_agent.core._batch import batch_runner
+from gqc_agent.core._llm_models import llm_router
+from gqc_agent.core._llm_models.stub_client import StubClient
+
+RECORDS = 10
+
+
+def _write_input(path, records=RECORDS):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(records):
+            query = f"find record {i}"
+            user_input = {"input": query, "current": {"role": "user", "query": query, "timestamp": "2025-01-01 12:00:00"}, "history": []}
+            f.write(json.dumps({"id": i, "user_input": user_input}) + "\n")
+        f.write("not json\n")
+
+
+def _read_output(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    input_path, output_path = str(tmp_path / "in.jsonl"), str(tmp_path / "out.jsonl")
+    _write_input(input_path)
+    return input_path, output_path
+
+
+@pytest.fixture
+def stub_calls(monkeypatch):
+    calls = []
+    complete = StubClient.complete
+
+    def counting_complete(self, model, system_prompt, user_prompt):
+        calls.append(user_prompt)
+        return complete(self, model, system_prompt, user_prompt)
+
+    monkeypatch.setattr(StubClient, "complete", counting_complete)
+    return calls
+
+
+def _interrupt_after(monkeypatch, records):
+    """Make the shard writer raise KeyboardInterrupt instead of writing record number `records` + 1."""
+    write = batch_runner._ShardWriter.write
+
+    def interrupting_write(self, line_no, record_id, result):
+        if self.written >= records:
+            raise KeyboardInterrupt
+        write(self, line_no, record_id, result)
+
+    monkeypatch.setattr(batch_runner._ShardWriter, "write", interrupting_write)
+
+
+def test_batch_writes_every_record(paths):
+    input_path, output_path = paths
+    assert batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub") == RECORDS + 1
+
+    rows = _read_output(output_path)
+    assert [row["line"] for row in rows] == list(range(RECORDS + 1))
+    assert rows[0]["id"] == 0 and rows[0]["result"]["intent"] == "search"
+    assert rows[-1]["result"] == {"error": "Invalid JSON"}
+    assert not os.path.exists(batch_runner._part_path(output_path, 0))
+    assert not os.path.exists(batch_runner._checkpoint_path(output_path, 0))
+
+
+def test_interrupted_batch_keeps_checkpoint_and_resumes(paths, monkeypatch, stub_calls):
+    input_path, output_path = paths
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 4)
+        with pytest.raises(KeyboardInterrupt):
+            batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", concurrency=1, checkpoint_every=1)
+
+    # Nothing is merged; the part file and its checkpoint are kept
+    assert not os.path.exists(output_path)
+    with open(batch_runner._checkpoint_path(output_path, 0), "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    assert checkpoint["next_line"] == 4 and checkpoint["done"] is False
+
+    stub_calls.clear()
+    assert batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", concurrency=1) == RECORDS + 1
+    # Only the records after the checkpoint are processed again, three agent calls each
+    assert len(stub_calls) == (RECORDS - 4) * 3
+    assert [row["line"] for row in _read_output(output_path)] == list(range(RECORDS + 1))
+
+
+def test_worker_exiting_without_finishing_is_not_merged(paths, monkeypatch):
+    input_path, output_path = paths
+    # A worker that returns before marking its checkpoint done
+    monkeypatch.setattr(batch_runner, "_shard_main", lambda *args: None)
+
+    with pytest.raises(RuntimeError, match="did not finish"):
+        batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub")
+    assert not os.path.exists(output_path)
+
+
+def test_checkpoint_rejects_other_worker_count(paths, monkeypatch):
+    input_path, output_path = paths
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", checkpoint_every=1)
+
+    with pytest.raises(ValueError, match="same --workers"):
+        batch_runner._load_checkpoint(batch_runner._checkpoint_path(output_path, 0), 2)
+
+
+def test_batch_api_resume_waits_for_saved_jobs(paths, monkeypatch):
+    input_path, output_path = paths
+    submitted = []
+    submit = llm_router.submit_stub_batch
+
+    def counting_submit(client, model, items, generation_config=None):
+        batch_id = submit(client, model, items, generation_config)
+        submitted.append(batch_id)
+        return batch_id
+
+    monkeypatch.setattr(llm_router, "submit_stub_batch", counting_submit)
+
+    def interrupted_wait(client, batch_id, poll_interval=0.0):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(llm_router, "wait_stub_batch", interrupted_wait)
+        with pytest.raises(KeyboardInterrupt):
+            batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", batch_api=True,
+                                   batch_size=4, max_pending_chunks=2, poll_interval=0)
+
+    # Two chunks (one job per agent each) were in flight, and their ids are checkpointed
+    with open(batch_runner._checkpoint_path(output_path, 0), "r", encoding="utf-8") as f:
+        saved = json.load(f)["batch_jobs"]
+    assert [(job["first_line"], job["last_line"]) for job in saved] == [(0, 3), (4, 7)]
+    assert sorted(batch_id for job in saved for batch_id in job["jobs"].values()) == sorted(submitted)
+
+    submitted.clear()
+    assert batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", batch_api=True,
+                                  batch_size=4, max_pending_chunks=2, poll_interval=0) == RECORDS + 1
+    # Only the last chunk (lines 8-9; line 10 is invalid) is submitted on resume
+    assert len(submitted) == 3
+    rows = _read_output(output_path)
+    assert [row["line"] for row in rows] == list(range(RECORDS + 1))
+    assert rows[5]["result"]["rephrased_queries"][0] == "find record 5"
+
+
+def test_batch_api_resubmits_jobs_that_cannot_be_resumed(paths, monkeypatch):
+    input_path, output_path = paths
+
+    def interrupted_wait(client, batch_id, poll_interval=0.0):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(llm_router, "wait_stub_batch", interrupted_wait)
+        with pytest.raises(KeyboardInterrupt):
+            batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", batch_api=True, batch_size=4)
+
+    # The provider no longer knows the saved jobs, as after a restart of the stub
+    monkeypatch.setattr("gqc_agent.core._llm_models.stub_client._BATCH_JOBS", {})
+    assert batch_runner.run_batch(input_path, output_path, None, "stub-small", "stub", batch_api=True, batch_size=4) == RECORDS + 1
+    assert [row["line"] for row in _read_output(output_path)] == list(range(RECORDS + 1))
@@ -0,0 +1,99 @@
+import pytest
+from gqc_agent.core.orchestrator import AgentPipeline
+from gqc_agent.core._resilience import circuit_breaker
+from gqc_agent.core._resilience.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+def _breaker(**options):
+    settings = {"failure_rate": 0.5, "window": 4, "min_calls": 4, "open_seconds": 30.0, "half_open_probes": 2}
+    settings.update(options)
+    return CircuitBreaker("stub", "stub-small", **settings)
+
+
+def _record(breaker, outcomes, latency=0.01):
+    for success in outcomes:
+        assert breaker.allow()
+        breaker.record(success, latency)
+
+
+def test_opens_once_failure_rate_is_reached(clock):
+    breaker = _breaker()
+    _record(breaker, [False, False, False])
+    assert breaker.state == CLOSED  # fewer than min_calls
+    breaker = _breaker()
+    _record(breaker, [False, True, True, True, False])
+    assert breaker.state == CLOSED  # the window holds [T, T, T, F]: 1 of 4 failed
+    _record(breaker, [False])
+    assert breaker.state == OPEN  # [T, T, F, F]: 2 of 4 failed
+    assert not breaker.allow()
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = _breaker(slow_call_ms=100)
+    _record(breaker, [True, True], latency=0.5)
+    _record(breaker, [True, True], latency=0.01)
+    assert breaker.state == OPEN
+
+
+def test_half_open_probes_close_the_breaker(clock):
+    breaker = _breaker()
+    _record(breaker, [False] * 4)
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only `half_open_probes` calls get through
+    breaker.record(True, 0.01)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.01)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = _breaker()
+    _record(breaker, [False] * 4)
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    breaker.record(False, 0.01)
+    assert breaker.state == OPEN
+    assert not breaker.allow()  # open_seconds restart from the failed probe
+
+
+def test_open_breaker_serves_degraded_response(clock):
+    pipeline = AgentPipeline(api_key=None, model="stub-small", provider="stub",
+                             circuit_breaker={"min_calls": 1, "window": 1, "open_seconds": 30},
+                             degraded_response={"intent": "ambiguous"})
+    session = pipeline.session("conversation")
+    assert session.run("find the pending brokers")["intent"] == "search"
+
+    breaker = pipeline.circuit_breakers[("stub", "stub-small")]
+    assert breaker.allow()
+    breaker.record(False, 0.01)
+    assert breaker.state == OPEN
+    assert pipeline.session("other").run("find the active brokers") == {
+        "intent": "ambiguous", "rephrased_queries": None, "notes": None
+    }
+
+    clock.now += 30
+    assert session.run("find the active brokers")["intent"] == "search"
+    assert breaker.state == CLOSED
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import pytest
+from gqc_agent.core.orchestrator import AgentPipeline
+from gqc_agent.core._server import http_server
+from gqc_agent.core._server.http_server import GQCServer
+
+QUERY = {"input": "hello", "current": {"role": "user", "query": "hello", "timestamp": "2025-01-01 12:00:00"}, "history": []}
+
+
+async def _exchange(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), body
+
+
+def _serve(requests, pipeline=None, **options):
+    """Start a server, send each raw request on its own connection and return (status, body) pairs."""
+    pipeline = pipeline or AgentPipeline(api_key=None, model="stub-small", provider="stub")
+    options.setdefault("keep_alive_timeout", 0.2)
+
+    async def main():
+        server = GQCServer(pipeline, **options)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return [await _exchange(port, request) for request in requests]
+        finally:
+            await server.drain()
+
+    return asyncio.run(main())
+
+
+def test_post_gqc_with_content_length():
+    body = json.dumps(QUERY).encode()
+    [(status, response)] = _serve([b"POST /gqc HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)])
+    assert status == 200 and json.loads(response)["intent"] == "greeting"
+
+
+def test_post_gqc_with_chunked_body():
+    body = json.dumps(QUERY).encode()
+    chunks = b"".join(b"%X;ext=1\r\n%s\r\n" % (len(body[i:i + 16]), body[i:i + 16]) for i in range(0, len(body), 16))
+    request = b"POST /gqc HTTP/1.1\r\nTransfer-Encoding: chunked\r\nConnection: close\r\n\r\n" + chunks + b"0\r\nX-Trailer: 1\r\n\r\n"
+    [(status, response)] = _serve([request])
+    assert status == 200 and json.loads(response)["intent"] == "greeting"
+
+
+@pytest.mark.parametrize("request_bytes, status", [
+    (b"GET /healthz HTTP/1.1\r\nX-Big: " + b"a" * 70000 + b"\r\n\r\n", 431),
+    (b"GET /" + b"a" * 70000 + b" HTTP/1.1\r\n\r\n", 414),
+    (b"GARBAGE\r\n\r\n", 400),
+    (b"POST /gqc HTTP/1.1\r\nTransfer-Encoding: gzip\r\n\r\n", 501),
+    (b"POST /gqc HTTP/1.1\r\nTransfer-Encoding: chunked\r\nContent-Length: 3\r\n\r\n", 400),
+    (b"POST /gqc HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n", 400),
+    (b"POST /gqc HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (http_server.MAX_BODY_BYTES + 1), 413),
+    (b"GET /unknown HTTP/1.1\r\nConnection: close\r\n\r\n", 404),
+    (b"GET /gqc HTTP/1.1\r\nConnection: close\r\n\r\n", 405),
+])
+def test_malformed_requests_get_error_responses(request_bytes, status):
+    [(response_status, body)] = _serve([request_bytes])
+    assert response_status == status and "error" in json.loads(body)
+
+
+def test_slow_request_times_out():
+    [(status, _)] = _serve([b"POST /gqc HTTP/1.1\r\nContent-Length: 10\r\n\r\n{"], read_timeout=0.1)
+    assert status == 408
+
+
+def test_idle_keep_alive_connection_is_closed():
+    # The response arrives and the server then closes the idle connection, ending the read
+    [(status, body)] = _serve([b"GET /healthz HTTP/1.1\r\n\r\n"])
+    assert status == 200 and json.loads(body) == {"status": "ok"}
+
+
+def test_readiness_retries_failed_catalog_warm_up(monkeypatch):
+    pipeline = AgentPipeline(api_key=None, model="stub-small", provider="stub")
+    failures = []
+    warm = pipeline.warm_model_catalog
+
+    def flaky_warm():
+        if len(failures) < 2:
+            failures.append(1)
+            return []
+        return warm()
+
+    pipeline._model_catalogs.clear()
+    monkeypatch.setattr(pipeline, "warm_model_catalog", flaky_warm)
+    monkeypatch.setattr(http_server, "WARMUP_RETRY_SECONDS", 0.01)
+
+    async def main():
+        server = GQCServer(pipeline)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            for _ in range(200):
+                status, _ = await _exchange(port, b"GET /readyz HTTP/1.1\r\nConnection: close\r\n\r\n")
+                if status == 200:
+                    return status
+                await asyncio.sleep(0.01)
+            return status
+        finally:
+            await server.drain()
+
+    assert asyncio.run(main()) == 200
+    assert len(failures) == 2
@@ -0,0 +1,113 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from gqc_agent.core._llm_models.micro_batcher import MicroBatcher, build_batch_prompts, parse_batch_response
+from gqc_agent.core._llm_models.single_flight import SingleFlight
+from gqc_agent.core._llm_models.stub_client import StubClient
+
+SYSTEM_PROMPT = 'Classify the intent. Respond with {"intent": "..."}.'
+
+
+class RecordingClient(StubClient):
+    """Stub client that records every prompt and can tamper with multi-item answers."""
+    def __init__(self, tamper=None):
+        super().__init__()
+        self.tamper = tamper
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def complete(self, model, system_prompt, user_prompt):
+        with self._lock:
+            self.prompts.append(user_prompt)
+        response = super().complete(model, system_prompt, user_prompt)
+        if self.tamper is not None and "### Request" in user_prompt:
+            return self.tamper(response)
+        return response
+
+
+def _submit_all(batcher, prompts):
+    with ThreadPoolExecutor(len(prompts)) as pool:
+        return list(pool.map(lambda prompt: json.loads(batcher.submit(SYSTEM_PROMPT, prompt)), prompts))
+
+
+def _batcher(client, **options):
+    return MicroBatcher("intent_classifier", "intent", client, "stub-small", "stub", max_wait_ms=5000, **options)
+
+
+def test_parse_batch_response_drops_malformed_items():
+    response = json.dumps({"results": [
+        {"id": "0", "intent": "search"},
+        {"id": "1"},  # missing output key
+        {"id": "7", "intent": "search"},  # unknown id
+        {"id": "2", "intent": "greeting"},
+        {"id": "2", "intent": "search"}  # duplicate id keeps the first answer
+    ]})
+    assert parse_batch_response(response, 3, "intent") == ['{"intent": "search"}', None, '{"intent": "greeting"}']
+    assert parse_batch_response("not json", 2, "intent") == [None, None]
+    assert parse_batch_response('{"results": {}}', 1, "intent") == [None]
+
+
+def test_concurrent_calls_share_one_request():
+    client = RecordingClient()
+    batcher = _batcher(client, max_batch_size=3)
+    results = _submit_all(batcher, ["hello", "delete user 12", "find brokers"])
+
+    assert [result["intent"] for result in results] == ["greeting", "tool_call", "search"]
+    assert len(client.prompts) == 1
+    assert batcher.stats() == {"batches": 1, "items": 3, "retries": 0, "mean_batch_size": 3.0}
+
+
+def test_malformed_items_are_retried_individually():
+    def drop_second(response):
+        results = json.loads(response)["results"]
+        results[1] = {"id": results[1]["id"], "unexpected": True}
+        return json.dumps({"results": results})
+
+    client = RecordingClient(tamper=drop_second)
+    batcher = _batcher(client, max_batch_size=3)
+    results = _submit_all(batcher, ["hello", "delete user 12", "find brokers"])
+
+    assert [result["intent"] for result in results] == ["greeting", "tool_call", "search"]
+    assert batcher.stats()["retries"] == 1
+    assert len(client.prompts) == 2 and client.prompts[1] == "delete user 12"
+
+
+def test_unparseable_batch_retries_every_item():
+    client = RecordingClient(tamper=lambda response: "not json")
+    batcher = _batcher(client, max_batch_size=2)
+    results = _submit_all(batcher, ["hello", "find brokers"])
+
+    assert [result["intent"] for result in results] == ["greeting", "search"]
+    assert batcher.stats()["retries"] == 2
+    assert sorted(client.prompts[1:]) == ["find brokers", "hello"]
+
+
+def test_partial_batch_is_sent_after_max_wait():
+    client = RecordingClient()
+    batcher = MicroBatcher("intent_classifier", "intent", client, "stub-small", "stub", max_batch_size=8, max_wait_ms=10)
+    assert json.loads(batcher.submit(SYSTEM_PROMPT, "hello")) == {"intent": "greeting"}
+    assert client.prompts == ["hello"]  # a single item is sent as a plain call
+
+
+def test_batch_prompt_keys_items_by_position():
+    system_prompt, user_prompt = build_batch_prompts(SYSTEM_PROMPT, ["first", "second"])
+    assert system_prompt.startswith(SYSTEM_PROMPT) and '"results"' in system_prompt
+    assert user_prompt == "### Request 0\nfirst\n\n### Request 1\nsecond"
+
+
+def test_single_flight_coalesces_and_caches_batched_calls():
+    client = RecordingClient()
+    single_flight = SingleFlight(cache={})
+    batcher = _batcher(client, max_batch_size=2, single_flight=single_flight)
+
+    # Identical calls join one in-flight call instead of filling a batch
+    results = _submit_all(batcher, ["hello", "hello", "find brokers", "find brokers"])
+    assert [result["intent"] for result in results] == ["greeting", "greeting", "search", "search"]
+    assert len(client.prompts) == 1 and client.prompts[0].count("### Request") == 2
+    stats = single_flight.stats()
+    assert stats["calls"] == 2 and stats["coalesced"] + stats["cache_hits"] == 2
+
+    # Cached answers are returned without joining a batch
+    assert json.loads(batcher.submit(SYSTEM_PROMPT, "find brokers")) == {"intent": "search"}
+    assert len(client.prompts) == 1
+    assert single_flight.stats()["cache_hits"] == stats["cache_hits"] + 1
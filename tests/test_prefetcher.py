@@ -0,0 +1,113 @@
+import pytest
+from gqc_agent.core.orchestrator import AgentPipeline
+from gqc_agent.core._intent_classifier.decision_log import read_decision_log
+from gqc_agent.core._speculation.prefetcher import SpeculativePrefetcher, normalize_text
+
+CONVERSATION = "conversation"
+
+
+def _pipeline(**options):
+    options.setdefault("prefetch_debounce_ms", 0)
+    return AgentPipeline(api_key=None, model="stub-small", provider="stub", **options)
+
+
+def _prefetch(pipeline, text):
+    """Prefetch `text` and wait until its speculation has finished."""
+    pipeline.prefetch(CONVERSATION, text)
+    speculation = pipeline.prefetcher._speculations[CONVERSATION]
+    speculation.timer.join(5)
+    return speculation.future.result(5)
+
+
+def _stats(pipeline):
+    stats = pipeline.prefetcher.stats()
+    return {key: stats[key] for key in ("started", "hits", "misses")}
+
+
+def test_normalize_text_only_collapses_whitespace():
+    assert normalize_text("  What is  meant\tby x? ") == "What is meant by x?"
+
+
+def test_matching_text_reuses_speculative_results():
+    pipeline = _pipeline()
+    client = pipeline.client
+    results = _prefetch(pipeline, "find the  pending brokers")
+    assert results["intent_classifier"] == {"intent": "search"}
+    calls = client.calls
+
+    result = pipeline.session(CONVERSATION).run("find the pending brokers ")
+    assert result["intent"] == "search" and result["notes"] is not None
+    assert client.calls == calls + 1  # only the note creator ran
+    assert _stats(pipeline) == {"started": 1, "hits": 1, "misses": 0}
+
+
+@pytest.mark.parametrize("final_text", ["Find the pending brokers", "find the pending brokers?", "find the pending broker"])
+def test_different_text_is_a_miss(final_text):
+    pipeline = _pipeline()
+    _prefetch(pipeline, "find the pending brokers")
+    result = pipeline.session(CONVERSATION).run(final_text)
+
+    assert result["rephrased_queries"][0] == final_text
+    assert _stats(pipeline) == {"started": 1, "hits": 0, "misses": 1}
+    assert pipeline.prefetcher.stats()["wasted_tokens"] > 0
+
+
+def test_fuzzy_reuse_is_opt_in():
+    pipeline = _pipeline(prefetch_min_similarity=0.9)
+    _prefetch(pipeline, "find the pending brokers")
+    pipeline.session(CONVERSATION).run("find the pending broker")
+    assert _stats(pipeline)["hits"] == 1
+
+
+def test_speculation_not_started_is_a_miss():
+    pipeline = _pipeline(prefetch_debounce_ms=60000)
+    pipeline.prefetch(CONVERSATION, "find the pending brokers")
+    pipeline.session(CONVERSATION).run("find the pending brokers")
+
+    assert _stats(pipeline) == {"started": 0, "hits": 0, "misses": 1}
+    assert pipeline.prefetcher.stats()["wasted_tokens"] == 0
+
+
+def test_changed_history_is_a_miss():
+    pipeline = _pipeline()
+    session = pipeline.session(CONVERSATION)
+    _prefetch(pipeline, "find the pending brokers")
+    session.add_response("Here are the pending brokers.")
+    session.store.append(CONVERSATION, {"role": "user", "query": "hello", "timestamp": "2025-01-01 12:00:00"})
+    session.run("find the pending brokers")
+    assert _stats(pipeline)["misses"] == 1
+
+
+def test_speculation_is_skipped_without_a_free_slot():
+    pipeline = _pipeline(max_in_flight=1, max_queue=10)
+    with pipeline.admission.admit():
+        assert _prefetch(pipeline, "find the pending brokers") == {}
+    pipeline.session(CONVERSATION).run("find the pending brokers")
+
+    # A skipped speculation is not a hit, and was not counted as an admission rejection
+    assert _stats(pipeline) == {"started": 0, "hits": 0, "misses": 1}
+    assert pipeline.admission.stats()["rejected"] == 0
+
+
+def test_degraded_results_are_not_reused():
+    pipeline = _pipeline(circuit_breaker={"min_calls": 1, "window": 1, "open_seconds": 60},
+                         degraded_response={"intent": "ambiguous"})
+    breaker = pipeline.circuit_breakers[("stub", "stub-small")]
+    assert breaker.allow()
+    breaker.record(False, 0.01)
+
+    results = _prefetch(pipeline, "find the pending brokers")
+    assert SpeculativePrefetcher.usable_results(results) == {}
+    assert pipeline.session(CONVERSATION).run("find the pending brokers")["intent"] == "ambiguous"
+    assert _stats(pipeline)["hits"] == 0
+
+
+def test_speculative_intent_is_not_logged(tmp_path):
+    log_path = str(tmp_path / "intent_log.jsonl")
+    pipeline = _pipeline(intent_log=log_path)
+    _prefetch(pipeline, "find the pending")
+    _prefetch(pipeline, "find the pending brokers")
+    pipeline.session(CONVERSATION).run("find the pending brokers")
+    pipeline.session("other").run("delete user 12")
+
+    assert [record["current"] for record in read_decision_log(log_path)] == ["delete user 12"]
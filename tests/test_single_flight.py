@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from gqc_agent.core._llm_models.llm_router import call_llm
+from gqc_agent.core._llm_models.single_flight import SingleFlight
+from gqc_agent.core._llm_models.stub_client import StubClient
+
+
+def _run_concurrently(single_flight, func, callers=5):
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return func()
+
+    with ThreadPoolExecutor(callers) as pool:
+        leader = pool.submit(single_flight.do, "key", blocking)
+        started.wait(5)
+        followers = [pool.submit(single_flight.do, "key", blocking) for _ in range(callers - 1)]
+        while single_flight.stats()["coalesced"] < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        return [leader] + followers
+
+
+def test_identical_calls_run_once():
+    single_flight = SingleFlight()
+    executions = []
+    futures = _run_concurrently(single_flight, lambda: executions.append(1) or "result")
+
+    assert [future.result() for future in futures] == ["result"] * 5
+    assert len(executions) == 1
+    assert single_flight.stats() == {"calls": 1, "coalesced": 4, "cache_hits": 0, "in_flight": 0}
+
+
+def test_followers_receive_the_leaders_exception():
+    def failing():
+        raise RuntimeError("provider down")
+
+    single_flight = SingleFlight()
+    for future in _run_concurrently(single_flight, failing):
+        with pytest.raises(RuntimeError, match="provider down"):
+            future.result()
+    # Failures are not kept: the next call runs again
+    assert single_flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_nothing_is_kept_without_cache():
+    single_flight = SingleFlight()
+    assert single_flight.do("key", lambda: "first") == "first"
+    assert single_flight.do("key", lambda: "second") == "second"
+    assert single_flight.peek("key") is None
+
+
+def test_cache_serves_completed_results():
+    single_flight = SingleFlight(cache={})
+    assert single_flight.do("key", lambda: "first") == "first"
+    assert single_flight.do("key", lambda: "second") == "first"
+    assert single_flight.peek("key") == "first"
+    assert single_flight.stats()["cache_hits"] == 1
+
+
+def test_call_llm_key_separates_prompts_and_clients():
+    single_flight = SingleFlight(cache={})
+    client, other_client = StubClient(), StubClient()
+    system_prompt = 'Respond with {"intent": "..."}.'
+
+    call_llm(client, "stub-small", "stub", system_prompt, "hello", single_flight)
+    call_llm(client, "stub-small", "stub", system_prompt, "hello", single_flight)
+    call_llm(client, "stub-small", "stub", system_prompt, "find brokers", single_flight)
+    call_llm(other_client, "stub-small", "stub", system_prompt, "hello", single_flight)
+    call_llm(client, "stub-small", "stub", system_prompt, "hello", single_flight, {"temperature": 0.5})
+
+    assert client.calls == 3 and other_client.calls == 1
+    assert single_flight.stats()["cache_hits"] == 1